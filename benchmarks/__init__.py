@@ -0,0 +1 @@
+"""Headless performance harnesses for the World Population app."""
@@ -0,0 +1,96 @@
+"""Drive ``Python_2.py`` headlessly through Streamlit's ``AppTest``.
+
+``option_menu`` is a custom component that ``AppTest`` cannot click, so the
+script is wrapped: the menu returns ``st.session_state['_bench_page']``
+instead, which lets one ``AppTest`` session move between pages the way a
+user does.  The app reads its Lottie animations from disk only, so runs
+never touch the network.
+"""
+import contextlib
+import threading
+
+from streamlit.runtime.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+
+from world_population.data import BASE_DIR
+
+APP_PATH = BASE_DIR / 'Python_2.py'
+
+
+def _bench_app(app_path):
+    import os
+    import sys
+
+    import streamlit as st
+    import streamlit_option_menu
+
+    def option_menu(menu_title, options, *args, **kwargs):
+        return st.session_state.get('_bench_page', options[0])
+
+    streamlit_option_menu.option_menu = option_menu
+    app_dir = os.path.dirname(app_path)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    with open(app_path, encoding='utf-8') as fh:
+        code = compile(fh.read(), app_path, 'exec')
+    exec(code, {'__name__': '__main__', '__file__': app_path})
+
+
+def make_app_test(timeout=120):
+    """Return an ``AppTest`` for the app that has not been run yet."""
+    return AppTest.from_function(_bench_app, args=(str(APP_PATH),), default_timeout=timeout)
+
+
+def open_page(at, page):
+    """Select ``page`` in the (stubbed) horizontal menu and rerun."""
+    at.session_state['_bench_page'] = page
+    return at.run()
+
+
+def set_selectbox(at, label, value):
+    """Set the selectbox labelled ``label`` to ``value`` and rerun."""
+    for selectbox in at.selectbox:
+        if selectbox.label == label:
+            return selectbox.set_value(value).run()
+    raise LookupError(f'No selectbox labelled {label!r}')
+
+
+def raise_for_exception(at, scenario):
+    if at.exception:
+        messages = '; '.join(exception.message for exception in at.exception)
+        raise RuntimeError(f'{scenario}: app raised {messages}')
+
+
+@contextlib.contextmanager
+def concurrent_sessions():
+    """Let several ``AppTest`` instances run at the same time.
+
+    Each ``AppTest`` run installs a mock ``Runtime`` singleton and resets it
+    to ``None`` when it finishes, which breaks any run still in progress on
+    another thread.  Inside this context the last installed runtime stays
+    visible until the context exits.
+    """
+    lock = threading.Lock()
+    last = []
+    original_instance = Runtime.__dict__['instance']
+    original_exists = Runtime.__dict__['exists']
+
+    def instance(cls):
+        with lock:
+            if cls._instance is not None:
+                last[:] = [cls._instance]
+                return cls._instance
+            if last:
+                return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or bool(last)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    try:
+        yield
+    finally:
+        Runtime.instance = original_instance
+        Runtime.exists = original_exists
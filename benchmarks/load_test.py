@@ -0,0 +1,248 @@
+"""Concurrent-session load test for the app.
+
+Run from the repository root::
+
+    python -m benchmarks.load_test --sessions 24 --concurrency 8 --steps 12
+    python -m benchmarks.load_test --sessions 50 --json .cache/load_test.json
+
+Every simulated session is its own ``AppTest`` (so its own session state)
+on a thread pool, all in this process, which shares the process-wide caches
+and dataset registry exactly like sessions of one Streamlit server.  Each
+session replays a random but realistic widget sequence: mostly Dashboard
+sidebar changes and map options, Story Tellings region changes and the
+occasional page switch.  The report gives throughput, p50/p95/p99 rerun
+latency overall and per action, and the process RSS sampled over the run.
+
+Reruns hold the GIL for most of their time, so latency under concurrency
+shows how much one server process can take before requests queue; use it
+to size the number of server workers and to check that cache changes help
+under load, not only for a single user.
+"""
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.harness import concurrent_sessions, make_app_test, open_page, raise_for_exception, set_selectbox
+from world_population.data import load_reshaped_df, load_worldpop_df, used_categories
+from world_population.figures import COLOR_THEMES
+from world_population.shared_cache import MemoryBackend, set_default_backend
+
+CONTINENTS = ['All', 'Africa', 'Asia', 'Europe', 'North America', 'South America']
+
+# Relative weight of each kind of interaction in a session
+ACTION_WEIGHTS = {
+    'dashboard_year': 5,
+    'dashboard_continent': 3,
+    'dashboard_country': 3,
+    'dashboard_theme': 2,
+    'story_region': 2,
+    'page': 1,
+}
+
+
+def session_actions(rng, steps):
+    """Return a list of ``(kind, page, label, value)`` widget actions."""
+    df = load_reshaped_df()
+    years = sorted({int(year) for year in df['year'].unique()}, reverse=True)
+    countries = {continent: used_categories(df['country'] if continent == 'All'
+                                            else df[df['continent'] == continent]['country'])
+                 for continent in CONTINENTS}
+    regions = list(load_worldpop_df()['Region'].unique())
+
+    kinds, weights = zip(*ACTION_WEIGHTS.items())
+    continent = 'All'
+    actions = [('page', 'Dashboard', None, 'Dashboard')]
+    for kind in rng.choices(kinds, weights, k=steps):
+        if kind == 'dashboard_year':
+            actions.append((kind, 'Dashboard', 'Select a year', rng.choice(years)))
+        elif kind == 'dashboard_continent':
+            continent = rng.choice(CONTINENTS)
+            actions.append((kind, 'Dashboard', 'Select a continent', continent))
+        elif kind == 'dashboard_country':
+            actions.append((kind, 'Dashboard', 'Select a country',
+                            rng.choice(['All'] + countries[continent])))
+        elif kind == 'dashboard_theme':
+            actions.append((kind, 'Dashboard', 'Select a color theme', rng.choice(COLOR_THEMES)))
+        elif kind == 'story_region':
+            actions.append((kind, 'Story Tellings', 'Select region', rng.choice(regions)))
+        else:
+            actions.append((kind, None, None, rng.choice(['Home', 'Dashboard', 'Story Tellings', 'Dataset'])))
+    return actions
+
+
+def run_session(session, actions, record):
+    """Replay ``actions`` in a fresh ``AppTest``; ``record(...)`` each rerun."""
+    at = make_app_test()
+    start = time.perf_counter()
+    at.run()
+    raise_for_exception(at, f'session {session} start')
+    record(session, 'start', start, time.perf_counter())
+
+    page = None
+    for kind, action_page, label, value in actions:
+        if action_page is not None and action_page != page:
+            # Navigating to the page the action needs is untimed setup
+            open_page(at, action_page)
+            page = action_page
+        start = time.perf_counter()
+        if kind == 'page':
+            open_page(at, value)
+            page = value
+        else:
+            try:
+                set_selectbox(at, label, value)
+            except LookupError:
+                # e.g. a country the current continent does not list
+                continue
+        record(session, kind, start, time.perf_counter())
+        raise_for_exception(at, f'session {session} {kind}={value}')
+
+
+def rss_bytes():
+    """Return this process's resident set size in bytes."""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Peak rather than current RSS (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RSSSampler(threading.Thread):
+    """Sample :func:`rss_bytes` every ``interval`` seconds until stopped."""
+
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._start = time.perf_counter()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append((time.perf_counter() - self._start, rss_bytes()))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.samples.append((time.perf_counter() - self._start, rss_bytes()))
+
+
+def _percentiles(latencies_ms):
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {'count': len(latencies_ms), 'p50_ms': round(float(p50), 1),
+            'p95_ms': round(float(p95), 1), 'p99_ms': round(float(p99), 1),
+            'max_ms': round(float(max(latencies_ms)), 1)}
+
+
+def run_load_test(sessions=20, concurrency=None, steps=10, seed=0, rss_interval=0.5, progress=None):
+    """Run ``sessions`` simulated sessions and return the report dict."""
+    rng = random.Random(seed)
+    scripts = [session_actions(rng, steps) for _ in range(sessions)]
+    # Start from empty caches, not from what an earlier run left in a disk
+    # or Redis backend
+    set_default_backend(MemoryBackend())
+
+    records = []
+    lock = threading.Lock()
+
+    def record(session, kind, start, end):
+        with lock:
+            records.append((session, kind, start, end))
+
+    errors = []
+    sampler = RSSSampler(rss_interval)
+    sampler.start()
+    start = time.perf_counter()
+    with concurrent_sessions(), \
+            concurrent.futures.ThreadPoolExecutor(max_workers=concurrency or sessions) as executor:
+        futures = {executor.submit(run_session, session, script, record): session
+                   for session, script in enumerate(scripts)}
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            try:
+                future.result()
+            except Exception as exc:
+                errors.append(f'session {futures[future]}: {exc}')
+            if progress:
+                progress(done, sessions)
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+
+    reruns = [(kind, (end - begin) * 1000) for _, kind, begin, end in records if kind != 'start']
+    by_kind = collections.defaultdict(list)
+    for kind, latency in reruns:
+        by_kind[kind].append(latency)
+    return {
+        'sessions': sessions,
+        'concurrency': concurrency or sessions,
+        'steps': steps,
+        'elapsed_s': round(elapsed, 2),
+        'reruns': len(reruns),
+        'throughput_rps': round(len(reruns) / elapsed, 2) if elapsed else None,
+        'session_start': _percentiles([(end - begin) * 1000 for _, kind, begin, end in records
+                                       if kind == 'start']) if records else None,
+        'latency': _percentiles([latency for _, latency in reruns]) if reruns else None,
+        'latency_by_action': {kind: _percentiles(values) for kind, values in sorted(by_kind.items())},
+        'rss_mb': [(round(t, 2), round(rss / 2**20, 1)) for t, rss in sampler.samples],
+        'errors': errors,
+    }
+
+
+def _print_report(report, rss_points=10):
+    print(f"{report['sessions']} sessions x {report['steps']} steps on {report['concurrency']} threads: "
+          f"{report['reruns']} reruns in {report['elapsed_s']:.1f}s "
+          f"({report['throughput_rps']} reruns/s)")
+    rows = [('all', report['latency'])] + list(report['latency_by_action'].items())
+    if report['session_start']:
+        rows.append(('session start', report['session_start']))
+    print(f"{'action':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in rows:
+        if stats:
+            print(f"{name:<22}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+                  f"{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+    samples = report['rss_mb']
+    step = max(1, len(samples) // rss_points)
+    print('RSS over time: ' + ', '.join(f'{t:.0f}s {mb:.0f} MB' for t, mb in samples[::step]))
+    print(f"peak RSS {max(mb for _, mb in samples):.0f} MB")
+    for error in report['errors']:
+        print(f'ERROR {error}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent-session load test for Python_2.py')
+    parser.add_argument('--sessions', type=int, default=20, help='simulated sessions')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='sessions running at once (default: all)')
+    parser.add_argument('--steps', type=int, default=10, help='widget actions per session')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the widget sequences')
+    parser.add_argument('--rss-interval', type=float, default=0.5, help='seconds between RSS samples')
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    def progress(done, total):
+        if not args.quiet:
+            print(f'[{done}/{total}] sessions finished', flush=True)
+
+    report = run_load_test(args.sessions, args.concurrency, args.steps, args.seed,
+                           args.rss_interval, progress)
+    _print_report(report)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
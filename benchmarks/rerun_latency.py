@@ -0,0 +1,212 @@
+"""Rerun-latency benchmark for every page of the app.
+
+Run from the repository root::
+
+    python -m benchmarks.rerun_latency                 # sampled grid
+    python -m benchmarks.rerun_latency --full          # every sidebar combination
+    python -m benchmarks.rerun_latency --save-baseline
+
+Each scenario is one widget interaction (a page switch, a Dashboard year
+change or a Story Tellings region change) driven through ``AppTest``, and
+the interaction itself is what is timed.  Before every repeat the app is
+moved, untimed, to a different page, year or region, so each timed rerun is
+a real change.  ``first_ms`` is the first such rerun, which builds the
+selection's figures and tables from scratch; ``wall_ms`` is the median of
+``--repeat`` reruns.  Peak memory comes from one extra rerun under
+``tracemalloc`` so tracing does not distort the timings.
+
+Results are compared with the baseline file (machine specific, so it lives
+in ``.cache/`` by default) and the command exits non-zero when a scenario is
+slower than ``--tolerance`` allows.
+"""
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.harness import make_app_test, open_page, raise_for_exception, set_selectbox
+from world_population.data import CACHE_DIR, load_reshaped_df, load_worldpop_df, used_categories
+from world_population.figures import COLOR_THEMES
+from world_population.prefetch import prefetcher
+from world_population.shared_cache import MemoryBackend, set_default_backend
+
+BASELINE_PATH = CACHE_DIR / 'rerun_latency_baseline.json'
+
+PAGES = ['Home', 'Dashboard', 'Story Tellings', 'Dataset']
+CONTINENTS = ['All', 'Africa', 'Asia', 'Europe', 'North America', 'South America']
+
+
+def dashboard_grid(full=False):
+    """Yield ``(year, continent, country, theme)`` sidebar selections.
+
+    The sampled grid covers every year and continent with the 'All' country
+    and one country per continent, under two color themes.
+    """
+    df = load_reshaped_df()
+    years = sorted({int(year) for year in df['year'].unique()}, reverse=True)
+    for continent in CONTINENTS:
+        if continent == 'All':
+            countries = ['All'] + (used_categories(df['country']) if full else [])
+        else:
+            names = used_categories(df[df['continent'] == continent]['country'])
+            countries = ['All'] + (names if full else names[:1])
+        themes = COLOR_THEMES if full else COLOR_THEMES[:2]
+        for year, country, theme in itertools.product(years, countries, themes):
+            yield year, continent, country, theme
+
+
+def measure(action, reset, repeat):
+    """Return ``(first_ms, median_ms, peak_kb)`` for calling ``action``.
+
+    ``reset`` runs untimed before every call and moves the app away from
+    the state ``action`` leads to.
+    """
+    timings = []
+    for _ in range(repeat):
+        reset()
+        start = time.perf_counter()
+        action()
+        timings.append((time.perf_counter() - start) * 1000)
+    reset()
+    tracemalloc.start()
+    try:
+        action()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return timings[0], statistics.median(timings), peak / 1024
+
+
+def run_benchmarks(full=False, repeat=3, progress=None):
+    """Return ``{scenario: {'first_ms': ..., 'wall_ms': ..., 'peak_kb': ...}}``."""
+    results = {}
+
+    def record(scenario, action, reset):
+        first_ms, wall_ms, peak_kb = measure(action, reset, repeat)
+        results[scenario] = {'first_ms': round(first_ms, 2), 'wall_ms': round(wall_ms, 2),
+                             'peak_kb': round(peak_kb, 1)}
+        if progress:
+            progress(scenario, results[scenario])
+
+    # Prefetched neighbors would turn first_ms into a race with the
+    # background builds, and entries left in a disk or Redis backend by an
+    # earlier run would make it a cache hit
+    prefetcher.enabled = False
+    set_default_backend(MemoryBackend())
+    at = make_app_test()
+    # The first run pays for imports and data loading
+    start = time.perf_counter()
+    at.run()
+    raise_for_exception(at, 'cold start')
+    results['cold start'] = {'first_ms': None, 'wall_ms': round((time.perf_counter() - start) * 1000, 2),
+                             'peak_kb': None}
+
+    def select(label, value, scenario):
+        set_selectbox(at, label, value)
+        raise_for_exception(at, scenario)
+
+    for index, page in enumerate(PAGES):
+        def switch(page=page):
+            open_page(at, page)
+            raise_for_exception(at, page)
+
+        def leave(other=PAGES[index - 1]):
+            open_page(at, other)
+        record(f'page {page}', switch, leave)
+
+    open_page(at, 'Dashboard')
+    years = sorted({int(year) for year in load_reshaped_df()['year'].unique()}, reverse=True)
+    for year, continent, country, theme in dashboard_grid(full):
+        scenario = f'Dashboard year={year} continent={continent} country={country} theme={theme}'
+        # The timed change is the year; the rest of the selection is set up
+        # from a neighboring year, untimed
+        other_year = years[years.index(year) - 1]
+
+        def setup(continent=continent, country=country, theme=theme, other_year=other_year):
+            select('Select a year', other_year, scenario)
+            select('Select a continent', continent, scenario)
+            select('Select a country', country, scenario)
+            select('Select a color theme', theme, scenario)
+
+        record(scenario, lambda year=year: select('Select a year', year, scenario), setup)
+
+    open_page(at, 'Story Tellings')
+    regions = list(load_worldpop_df()['Region'].unique())
+    for index, region in enumerate(regions):
+        record(f'Story region={region}',
+               lambda region=region: select('Select region', region, f'Story {region}'),
+               lambda other=regions[index - 1]: select('Select region', other, f'Story {other}'))
+
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Return the scenarios that are slower than the baseline allows."""
+    regressions = []
+    for scenario, result in results.items():
+        previous = baseline.get(scenario)
+        if previous is None or scenario == 'cold start':
+            continue
+        # Both the first (uncached) and the typical rerun must hold up
+        for metric in ('first_ms', 'wall_ms'):
+            if previous.get(metric) is None:
+                continue
+            limit = max(previous[metric] * (1 + tolerance), previous[metric] + min_delta_ms)
+            if result[metric] > limit:
+                regressions.append((f'{scenario} [{metric}]', previous[metric], result[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rerun-latency benchmark for Python_2.py')
+    parser.add_argument('--full', action='store_true', help='run every sidebar combination')
+    parser.add_argument('--repeat', type=int, default=3, help='timed reruns per scenario')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--tolerance', type=float, default=0.30,
+                        help='allowed relative slowdown per scenario (default: 0.30)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='ignore slowdowns smaller than this many ms (default: 5)')
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    def progress(scenario, result):
+        if not args.quiet:
+            print(f"{result['first_ms']:9.1f} ms {result['wall_ms']:9.1f} ms "
+                  f"{result['peak_kb']:10.0f} KB  {scenario}")
+
+    results = run_benchmarks(args.full, args.repeat, progress)
+    timings = [result['wall_ms'] for name, result in results.items() if name != 'cold start']
+    print(f"cold start {results['cold start']['wall_ms']:.0f} ms, "
+          f"{len(timings)} scenarios, median rerun {statistics.median(timings):.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.save_baseline:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        print(f'baseline written to {args.baseline}')
+        return 0
+
+    try:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    except FileNotFoundError:
+        print('no baseline yet; run with --save-baseline to create one')
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for scenario, before, after in regressions:
+        print(f'REGRESSION {scenario}: {before:.1f} ms -> {after:.1f} ms')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Lets the tests under ``tests/`` import ``world_population`` from the repository root."""
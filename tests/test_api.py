@@ -0,0 +1,82 @@
+import io
+import json
+import urllib.parse
+
+import pyarrow as pa
+from tornado.testing import AsyncHTTPTestCase
+
+from world_population.api import etag_matches, make_app, response_cache
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"other", W/"abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"other"', '"abc"')
+    assert not etag_matches('', '"abc"')
+
+
+class ApiTest(AsyncHTTPTestCase):
+    def get_app(self):
+        response_cache.clear()
+        return make_app()
+
+    def get(self, path, **headers):
+        return self.fetch(path, headers=headers)
+
+    def test_index_lists_datasets(self):
+        response = self.get('/')
+        assert response.code == 200
+        assert set(json.loads(response.body)) == {'reshaped', 'annual', 'merged', 'worldpop'}
+
+    def test_filters_and_projects(self):
+        response = self.get('/reshaped?year=2020&continent=Asia&country=India&country=China'
+                            '&columns=country,population')
+        assert response.code == 200
+        rows = json.loads(response.body)
+        assert sorted(row['country'] for row in rows) == ['China', 'India']
+        assert set(rows[0]) == {'country', 'population'}
+
+    def test_bool_filter(self):
+        rows = json.loads(self.get('/annual?country=Japan&interpolated=False').body)
+        assert rows and not any(row['interpolated'] for row in rows)
+
+    def test_csv_and_arrow(self):
+        csv = self.get('/reshaped?year=2020&country=Japan&format=csv')
+        assert csv.headers['Content-Type'].startswith('text/csv')
+        assert csv.body.decode('utf-8').splitlines()[0].startswith('country,')
+        arrow = self.get('/reshaped?year=2020&country=Japan&format=arrow')
+        table = pa.ipc.open_stream(io.BytesIO(arrow.body)).read_all()
+        assert table.num_rows == 1
+
+    def test_response_cache_is_bounded_by_bytes(self):
+        small = self.get('/reshaped?year=2020&country=Japan')
+        assert response_cache.nbytes == len(small.body)
+        maxbytes, response_cache.maxbytes = response_cache.maxbytes, 1024
+        try:
+            assert self.get('/reshaped?year=2020').code == 200
+        finally:
+            response_cache.maxbytes = maxbytes
+        # The full body was served but not kept
+        assert len(response_cache) == 1 and response_cache.nbytes == len(small.body)
+
+    def test_revalidation(self):
+        first = self.get('/reshaped?year=2020')
+        etag = first.headers['ETag']
+        assert self.get('/reshaped?year=2020', **{'If-None-Match': etag}).code == 304
+        assert self.get('/reshaped?year=2020', **{'If-None-Match': f'W/{etag}'}).code == 304
+        assert self.get('/reshaped?year=2020', **{'If-None-Match': '*'}).code == 304
+        changed = self.get('/reshaped?year=2022', **{'If-None-Match': etag})
+        assert changed.code == 200 and changed.headers['ETag'] != etag
+
+    def test_errors_are_reported_in_the_body(self):
+        response = self.get('/reshaped?' + urllib.parse.urlencode({'zé': 'x'}))
+        assert response.code == 400
+        assert json.loads(response.body) == {'error': "unknown column 'zé'"}
+        assert response.reason == 'Bad Request'
+        assert self.get('/reshaped?year=soon').code == 400
+        assert self.get('/reshaped?format=xml').code == 400
+        missing = self.get('/nothing')
+        assert missing.code == 404
+        assert json.loads(missing.body) == {'error': "unknown dataset 'nothing'"}
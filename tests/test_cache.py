@@ -0,0 +1,89 @@
+from world_population.cache import LRUCache
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the oldest
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.put('a', 1)
+    clock.now = 9
+    assert cache.get('a') == 1
+    clock.now = 10
+    assert 'a' not in cache
+    assert cache.get('a', 'missing') == 'missing'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_per_entry_ttl_overrides_default():
+    clock = Clock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.put('short', 1, ttl=1)
+    cache.put('forever', 2, ttl=None)
+    clock.now = 5
+    assert cache.get('short') is None
+    clock.now = 1000
+    assert cache.get('forever') == 2
+
+
+def test_get_or_create_counts_hits_and_misses():
+    cache = LRUCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get_or_create('key', build) == 'value'
+    assert cache.get_or_create('key', build) == 'value'
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_pop_and_clear():
+    cache = LRUCache()
+    cache.put('a', 1)
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'gone') == 'gone'
+    cache.put('b', 2)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_maxbytes_bounds_the_total_size():
+    cache = LRUCache(maxsize=100, maxbytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    cache.put('c', b'1234')  # 12 bytes: 'a' goes
+    assert 'a' not in cache and cache.get('b') == b'1234'
+    assert cache.stats()['nbytes'] == 8
+    cache.put('b', b'12')  # replacing an entry releases its old size
+    assert cache.stats()['nbytes'] == 6
+    cache.pop('c')
+    assert cache.stats()['nbytes'] == 2
+
+
+def test_value_larger_than_maxbytes_is_not_stored():
+    cache = LRUCache(maxbytes=10)
+    cache.put('a', b'1234')
+    assert cache.get_or_create('big', lambda: b'x' * 11) == b'x' * 11
+    assert 'big' not in cache and cache.get('a') == b'1234'
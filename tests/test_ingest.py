@@ -0,0 +1,138 @@
+import pandas as pd
+import pytest
+
+from world_population import ingest
+from world_population.ingest import diff_cells, ingest_workbook, load_long_store, melt_years, read_manifest
+
+
+def workbook(rows=None, years=('2000', '2010')):
+    rows = rows or {
+        'India': ('Asia', [1000.0, 1200.0]),
+        'Chad': ('Africa', [8.0, 11.0]),
+        'Peru': ('South America', [26.0, 29.0]),
+    }
+    data = {'country': list(rows), 'continent': [continent for continent, _ in rows.values()]}
+    for position, year in enumerate(years):
+        data[year] = [values[position] for _, values in rows.values()]
+    return pd.DataFrame(data)
+
+
+def cells(merged_df):
+    return melt_years(merged_df, ingest.detect_year_columns(merged_df.columns))
+
+
+def stored(store_dir):
+    return load_long_store(store_dir).sort_values(['country', 'year']).reset_index(drop=True)
+
+
+def expected(merged_df):
+    return cells(merged_df).sort_values(['country', 'year']).reset_index(drop=True)
+
+
+def assert_store_matches(store_dir, merged_df):
+    pd.testing.assert_frame_equal(stored(store_dir), expected(merged_df), check_dtype=False)
+
+
+def changes(delta):
+    return {(row.country, int(row.year)): row.change for row in delta.itertuples()}
+
+
+def test_diff_cells_reports_added_changed_and_removed_cells():
+    old = cells(workbook())
+    new_df = workbook().drop(index=1).reset_index(drop=True)
+    new_df.loc[0, '2010'] = 1300.0
+    new_df.loc[len(new_df)] = ['Fiji', 'Oceania', 0.8, 0.9]
+    delta = diff_cells(old, cells(new_df))
+
+    assert changes(delta) == {
+        ('India', 2010): 'changed',
+        ('Fiji', 2000): 'added', ('Fiji', 2010): 'added',
+        ('Chad', 2000): 'removed', ('Chad', 2010): 'removed',
+    }
+    tombstones = delta[delta['deleted']]
+    assert set(tombstones['country']) == {'Chad'}
+    assert tombstones['population'].isna().all()
+
+
+def test_diff_cells_of_identical_cells_is_empty():
+    old = cells(workbook())
+    assert diff_cells(old, old.iloc[::-1]).empty
+
+
+def test_missing_values_compare_equal():
+    merged_df = workbook({'India': ('Asia', [None, 1.0])})
+    assert diff_cells(cells(merged_df), cells(merged_df)).empty
+
+
+def test_first_ingest_writes_a_base(tmp_path):
+    report = ingest_workbook(workbook(), 'book.xlsx', tmp_path)
+    assert report['written'] == 'base-000001.arrow' and report['compacted']
+    assert_store_matches(tmp_path, workbook())
+
+
+def test_unchanged_workbook_writes_nothing(tmp_path):
+    ingest_workbook(workbook(), 'book.xlsx', tmp_path)
+    report = ingest_workbook(workbook(), 'book.xlsx', tmp_path)
+    assert report['written'] is None
+    assert report['skipped'] == ['2000', '2010']
+
+
+@pytest.mark.parametrize('edit, touched', [
+    (lambda df: df.assign(**{'2010': df['2010'].where(df['country'] != 'Chad', 12.0)}),
+     {'2010': {'added': 0, 'changed': 1, 'removed': 0}}),
+    (lambda df: df[df['country'] != 'Peru'],
+     {'2000': {'added': 0, 'changed': 0, 'removed': 1}, '2010': {'added': 0, 'changed': 0, 'removed': 1}}),
+    (lambda df: df.assign(**{'2020': [1400.0, 14.0, 32.0]}),
+     {'2020': {'added': 3, 'changed': 0, 'removed': 0}}),
+])
+def test_changes_are_appended_as_a_delta(tmp_path, monkeypatch, edit, touched):
+    monkeypatch.setattr(ingest, 'MAX_DELTA_SHARE', 1.0)
+    ingest_workbook(workbook(), 'book.xlsx', tmp_path)
+    edited = edit(workbook()).reset_index(drop=True)
+    report = ingest_workbook(edited, 'book.xlsx', tmp_path)
+    assert report['written'] == 'delta-000002.arrow' and not report['compacted']
+    assert report['touched'] == touched
+    assert_store_matches(tmp_path, edited)
+
+
+def test_dropped_year_is_reported_and_removed(tmp_path):
+    ingest_workbook(workbook(), 'book.xlsx', tmp_path)
+    edited = workbook().drop(columns='2000')
+    report = ingest_workbook(edited, 'book.xlsx', tmp_path)
+    assert report['dropped'] == ['2000']
+    assert report['touched'] == {'2000': {'added': 0, 'changed': 0, 'removed': 3}}
+    assert_store_matches(tmp_path, edited)
+
+
+def test_resorted_workbook_only_records_the_digest(tmp_path):
+    ingest_workbook(workbook(), 'book.xlsx', tmp_path)
+    before = read_manifest(tmp_path)
+    resorted = workbook().iloc[::-1].reset_index(drop=True)
+    report = ingest_workbook(resorted, 'book.xlsx', tmp_path)
+    after = read_manifest(tmp_path)
+    assert report['written'] is None and report['touched'] == {}
+    assert after['digest'] != before['digest']
+    assert after['base'] == before['base'] and after['segments'] == []
+    assert ingest_workbook(resorted, 'book.xlsx', tmp_path)['skipped'] == ['2000', '2010']
+
+
+def test_deltas_past_max_segments_are_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, 'MAX_DELTA_SHARE', 100.0)
+    merged_df = workbook()
+    ingest_workbook(merged_df, 'book.xlsx', tmp_path)
+    for step in range(ingest.MAX_SEGMENTS + 1):
+        merged_df = merged_df.assign(**{'2010': merged_df['2010'] + 1})
+        report = ingest_workbook(merged_df, 'book.xlsx', tmp_path)
+    assert report['compacted'] and report['written'].startswith('base-')
+    assert read_manifest(tmp_path)['segments'] == []
+    assert sorted(path.name for path in tmp_path.glob('*.arrow')) == [report['written']]
+    assert_store_matches(tmp_path, merged_df)
+
+
+def test_deltas_past_max_share_are_compacted(tmp_path):
+    ingest_workbook(workbook(), 'book.xlsx', tmp_path)
+    edited = workbook().assign(**{'2000': [1.0, 2.0, 3.0]})
+    report = ingest_workbook(edited, 'book.xlsx', tmp_path)
+    # 3 of 6 cells changed, past MAX_DELTA_SHARE of the base
+    assert report['compacted']
+    assert_store_matches(tmp_path, edited)
@@ -0,0 +1,65 @@
+import gc
+
+import pandas as pd
+
+from world_population.registry import DatasetRegistry
+
+
+def make_registry(version=None):
+    loads = []
+    version = version if version is not None else [1]
+
+    def loader():
+        loads.append(1)
+        return pd.DataFrame({'country': ['India', 'China'], 'population': [1.0, 2.0]})
+
+    registry = DatasetRegistry()
+    registry.register('reshaped', loader, lambda: version[0])
+    return registry, loads, version
+
+
+def test_loads_once_for_every_session():
+    registry, loads, _ = make_registry()
+    first, second = registry.get('reshaped'), registry.get('reshaped')
+    assert len(loads) == 1
+    assert first is not second
+    assert registry.stats()['reshaped']['views_created'] == 2
+
+
+def test_mutating_a_view_does_not_leak_to_other_sessions():
+    registry, _, _ = make_registry()
+    mine, theirs = registry.get('reshaped'), registry.get('reshaped')
+    mine.loc[0, 'population'] = -1.0
+    mine['extra'] = 1
+    assert theirs.loc[0, 'population'] == 1.0
+    assert 'extra' not in theirs.columns
+    assert registry.get('reshaped').loc[0, 'population'] == 1.0
+
+
+def test_reloads_when_the_signature_changes():
+    registry, loads, version = make_registry()
+    old = registry.get('reshaped')
+    version[0] = 2
+    new = registry.get('reshaped')
+    assert len(loads) == 2
+    assert registry.stats()['reshaped']['loads'] == 2
+    # Views handed out earlier keep the data they were given
+    assert old is not new and len(old) == 2
+
+
+def test_counts_live_views():
+    registry, _, _ = make_registry()
+    view = registry.get('reshaped')
+    assert registry.stats()['reshaped']['live_views'] == 1
+    del view
+    gc.collect()
+    stats = registry.stats()['reshaped']
+    assert stats['live_views'] == 0
+    assert stats['rows'] == 2 and stats['bytes'] > 0
+
+
+def test_ensure_keeps_the_first_registration():
+    registry, loads, _ = make_registry()
+    registry.ensure('reshaped', lambda: pd.DataFrame({'other': [1]}))
+    assert list(registry.get('reshaped').columns) == ['country', 'population']
+    assert registry.names() == ['reshaped']
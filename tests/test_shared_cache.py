@@ -0,0 +1,161 @@
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from world_population.shared_cache import (DiskBackend, FakeRedis, MemoryBackend, RedisBackend, SharedCache,
+                                           default_backend, dumps, loads, make_backend, set_default_backend)
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenBackend:
+    def get(self, key):
+        raise OSError('backend down')
+
+    def set(self, key, payload, ttl=None):
+        raise OSError('backend down')
+
+
+@pytest.mark.parametrize('value', [None, 'text', b'\x00bytes', ''])
+def test_round_trip_scalars(value):
+    assert loads(dumps(value)) == value
+
+
+def test_round_trip_dataframe():
+    frame = pd.DataFrame({'country': ['India', 'China'], 'population': [1_417_173_173, 1_425_887_337]})
+    pd.testing.assert_frame_equal(loads(dumps(frame)), frame)
+
+
+def test_round_trip_figure():
+    figure = go.Figure(go.Scatter(x=[1970, 2022], y=[1.0, 2.0], name='India'))
+    restored = loads(dumps(figure))
+    assert isinstance(restored, go.Figure)
+    assert restored.to_dict() == figure.to_dict()
+
+
+def test_unsupported_values():
+    with pytest.raises(TypeError):
+        dumps(object())
+    with pytest.raises(ValueError):
+        loads(b'?payload')
+
+
+def test_disk_backend_expires_entries(tmp_path):
+    clock = Clock()
+    backend = DiskBackend(tmp_path, clock=clock)
+    backend.set('short', b'a', ttl=10)
+    backend.set('forever', b'b')
+    clock.now += 5
+    assert backend.get('short') == b'a'
+    clock.now += 10
+    assert backend.get('short') is None
+    assert backend.get('forever') == b'b'
+    assert len(list(tmp_path.glob('*.bin'))) == 1
+
+
+def test_disk_backend_prune(tmp_path):
+    clock = Clock()
+    backend = DiskBackend(tmp_path, clock=clock)
+    backend.set('a', b'a', ttl=1)
+    backend.set('b', b'b', ttl=100)
+    clock.now += 10
+    assert backend.prune() == 1
+    assert backend.get('b') == b'b'
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_fake_redis_expires_entries():
+    clock = Clock()
+    backend = RedisBackend(FakeRedis(clock=clock), prefix='test:')
+    backend.set('short', b'a', ttl=0.5)
+    backend.set('forever', b'b')
+    assert backend.get('short') == b'a'
+    clock.now += 1
+    assert backend.get('short') is None
+    assert backend.get('forever') == b'b'
+    backend.clear()
+    assert backend.get('forever') is None
+
+
+def test_shared_cache_per_entry_ttl():
+    clock = Clock()
+    cache = SharedCache('figures', ttl=100, backend=RedisBackend(FakeRedis(clock=clock)))
+    cache.put(('default',), 'kept')
+    cache.put(('short',), 'gone', ttl=1)
+    clock.now += 10
+    assert cache.get(('default',)) == 'kept'
+    assert cache.get(('short',)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_shared_cache_namespaces_do_not_collide():
+    backend = MemoryBackend()
+    SharedCache('story', backend=backend).put(('Asia',), 'story')
+    assert SharedCache('ranking', backend=backend).get(('Asia',)) is None
+
+
+def test_backend_errors_count_as_misses():
+    cache = SharedCache('figures', backend=BrokenBackend())
+    assert cache.get(('key',), 'default') == 'default'
+    assert cache.get_or_create(('key',), lambda: 'built') == 'built'
+    stats = cache.stats()
+    assert stats['errors'] == 3
+    assert stats['misses'] == 2
+    assert stats['hits'] == 0
+
+
+def test_get_or_create_builds_once():
+    cache = SharedCache('tables', backend=MemoryBackend())
+    calls = []
+
+    def build():
+        calls.append(1)
+        return pd.DataFrame({'a': [1, 2]})
+
+    first = cache.get_or_create(('key',), build)
+    second = cache.get_or_create(('key',), build)
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_default_backend_can_be_replaced():
+    previous = default_backend()
+    backend = RedisBackend(FakeRedis())
+    set_default_backend(backend)
+    try:
+        cache = SharedCache('figures')
+        cache.put(('key',), 'value')
+        assert cache.backend is backend
+        assert cache.stats()['backend'] == 'RedisBackend'
+        assert SharedCache('figures').get(('key',)) == 'value'
+    finally:
+        set_default_backend(previous)
+
+
+def test_make_backend_specs(tmp_path):
+    assert isinstance(make_backend('memory'), MemoryBackend)
+    assert isinstance(make_backend('fakeredis').client, FakeRedis)
+    disk = make_backend(f'disk:{tmp_path}')
+    assert isinstance(disk, DiskBackend) and disk.directory == tmp_path
+    with pytest.raises(ValueError):
+        make_backend('memcached://localhost')
+
+
+def test_version_is_part_of_the_key():
+    backend = MemoryBackend()
+    SharedCache('figures', backend=backend, version=1).put(('key',), 'old figure')
+    assert SharedCache('figures', backend=backend, version=2).get(('key',)) is None
+    assert SharedCache('figures', backend=backend, version=1).get(('key',)) == 'old figure'
+
+
+def test_memory_is_the_default_backend(monkeypatch):
+    monkeypatch.delenv('WORLDPOP_CACHE_BACKEND', raising=False)
+    assert isinstance(make_backend(), MemoryBackend)
+    monkeypatch.setenv('WORLDPOP_CACHE_BACKEND', 'disk')
+    assert isinstance(make_backend(), DiskBackend)
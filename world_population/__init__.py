@@ -0,0 +1 @@
+"""Support code for the World Population Streamlit app (``Python_2.py``)."""
@@ -0,0 +1,188 @@
+"""Local HTTP query service over the app's cached data.
+
+Serves the same frames as the Dashboard and Dataset pages so other services
+do not have to scrape the dashboard::
+
+    python -m world_population.api --port 8502
+
+    GET /reshaped?year=2020&continent=Asia&format=csv
+    GET /annual?country=Japan&interpolated=False
+    GET /merged?country=India&columns=country,2020,growth_rate
+    GET /worldpop?Region=Africa&Category=Births&format=arrow
+
+Any column can be filtered by repeating it as a query argument (values are
+OR-ed, columns are AND-ed); ``columns`` projects, ``format`` (``json``,
+``csv`` or ``arrow``) picks the encoding.  Every response carries an ETag
+derived from the dataset's source file signature and the normalized query,
+so ``If-None-Match`` revalidation (weak comparison, ``*`` included) answers
+304 without touching the data, and rendered bodies are kept in an LRU cache
+for repeated bulk pulls.  Errors come back as ``{"error": message}``.
+"""
+import argparse
+import hashlib
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import tornado.ioloop
+import tornado.web
+
+from world_population.cache import LRUCache
+from world_population.data import (WORKBOOK_PATH, WORLDPOP_PATH, category_mask, file_signature,
+                                   load_annual_df, load_merged_df, load_reshaped_df, load_worldpop_df)
+
+DATASETS = {
+    'reshaped': (load_reshaped_df, WORKBOOK_PATH),
+    'annual': (load_annual_df, WORKBOOK_PATH),
+    'merged': (load_merged_df, WORKBOOK_PATH),
+    'worldpop': (load_worldpop_df, WORLDPOP_PATH),
+}
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'csv': 'text/csv; charset=utf-8',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+# Rendered bodies keyed on ETag, bounded by their total size: a full
+# /annual JSON alone is about 2 MB
+response_cache = LRUCache(maxsize=256, ttl=60 * 60, maxbytes=64 * 1024 * 1024)
+
+
+class QueryError(ValueError):
+    pass
+
+
+def filter_frame(df, filters):
+    """Return the rows of ``df`` matching ``{column: [values]}``."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in filters.items():
+        if column not in df.columns:
+            raise QueryError(f'unknown column {column!r}')
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            column_mask = np.zeros(len(df), dtype=bool)
+            for value in values:
+                column_mask |= category_mask(series, value)
+        elif pd.api.types.is_bool_dtype(series):
+            flags = {value.lower() in ('1', 'true', 'yes') for value in values}
+            column_mask = np.isin(series.to_numpy(), list(flags))
+        elif pd.api.types.is_numeric_dtype(series):
+            try:
+                numbers = [float(value) for value in values]
+            except ValueError:
+                raise QueryError(f'{column!r} expects numbers') from None
+            column_mask = np.isin(series.to_numpy(dtype='float64', na_value=np.nan), numbers)
+        else:
+            column_mask = series.astype(str).isin(values).to_numpy()
+        mask &= column_mask
+    return df[mask]
+
+
+def render(df, fmt):
+    """Encode ``df`` as ``fmt``; return bytes."""
+    if fmt == 'json':
+        return df.to_json(orient='records').encode('utf-8')
+    if fmt == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+    if fmt == 'arrow':
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue()
+    raise QueryError(f'unknown format {fmt!r}')
+
+
+def make_etag(name, version, filters, columns, fmt):
+    query = json.dumps([name, version, sorted((k, sorted(v)) for k, v in filters.items()),
+                        columns, fmt], default=str)
+    return '"' + hashlib.sha1(query.encode('utf-8')).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Return whether an ``If-None-Match`` header matches ``etag`` (weakly)."""
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    if '*' in tags:
+        return True
+    return etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in tags}
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def write_error(self, status_code, **kwargs):
+        # The message goes in the body: the status line only carries ASCII
+        exc = kwargs.get('exc_info', (None, None, None))[1]
+        message = getattr(exc, 'log_message', None) or self._reason
+        self.finish({'error': message})
+
+
+class IndexHandler(BaseHandler):
+    def get(self):
+        self.write({name: f'/{name}' for name in DATASETS})
+
+
+class DatasetHandler(BaseHandler):
+    def get(self, name):
+        if name not in DATASETS:
+            raise tornado.web.HTTPError(404, f'unknown dataset {name!r}')
+        loader, source = DATASETS[name]
+
+        # Tornado decodes query keys as latin-1; column names are UTF-8
+        arguments = {key.encode('latin-1').decode('utf-8'): [value.decode('utf-8') for value in values]
+                     for key, values in self.request.query_arguments.items()}
+        fmt = (arguments.pop('format', ['json']) or ['json'])[-1]
+        if fmt not in CONTENT_TYPES:
+            raise tornado.web.HTTPError(400, f'unknown format {fmt!r}')
+        columns = arguments.pop('columns', None)
+        columns = [c for value in columns for c in value.split(',') if c] if columns else None
+
+        etag = make_etag(name, file_signature(source), arguments, columns, fmt)
+        self.set_header('ETag', etag)
+        self.set_header('Cache-Control', 'no-cache')
+        if etag_matches(self.request.headers.get('If-None-Match', ''), etag):
+            self.set_status(304)
+            return
+
+        def build():
+            df = filter_frame(loader(), arguments)
+            if columns:
+                missing = [column for column in columns if column not in df.columns]
+                if missing:
+                    raise QueryError(f'unknown columns {missing}')
+                df = df[columns]
+            return render(df, fmt)
+
+        try:
+            body = response_cache.get_or_create(etag, build)
+        except QueryError as exc:
+            raise tornado.web.HTTPError(400, str(exc)) from None
+        self.set_header('Content-Type', CONTENT_TYPES[fmt])
+        self.write(body)
+
+    def compute_etag(self):
+        # The ETag is set explicitly from the query, not hashed from the body
+        return None
+
+
+def make_app():
+    return tornado.web.Application([
+        (r'/', IndexHandler),
+        (r'/([a-z_]+)', DatasetHandler),
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='World Population query service')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--address', default='127.0.0.1')
+    args = parser.parse_args(argv)
+    app = make_app()
+    app.listen(args.port, address=args.address)
+    print(f'Serving on http://{args.address}:{args.port}/')
+    tornado.ioloop.IOLoop.current().start()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Local store for the Lottie animations shown on the Home page.
+
+Animations are looked up by name and read from ``assets/lottie/<name>.json``;
+the app itself never goes to the network.  Run
+``python -m world_population.assets`` while online (e.g. in the image
+build; the dev container's ``updateContentCommand`` does) to download
+every registered animation into that directory.  The Home page shows a
+caption in place of an animation that is not there, and picks it up as
+soon as the file appears.
+"""
+import json
+import pathlib
+import sys
+import threading
+
+from world_population.atomic import write_bytes
+
+# Not imported from world_population.data, which would load pandas and
+# pyarrow into the Home page
+LOTTIE_DIR = pathlib.Path(__file__).resolve().parent.parent / 'assets' / 'lottie'
+
+LOTTIE_ASSETS = {
+    'welcome': 'https://lottie.host/a007d4b2-dcb3-42b9-a81f-8974176f0b70/M8B2rnF26Q.json',
+    'overview': 'https://lottie.host/4ff32b59-3137-42c6-ae6f-6831e22604e7/AM5TmClSle.json',
+}
+
+_memory = {}
+_lock = threading.Lock()
+
+
+def register_lottie(name, url=None):
+    """Register an animation under ``name``.
+
+    ``url`` may be omitted for animations that only exist as a file in
+    :data:`LOTTIE_DIR`.
+    """
+    LOTTIE_ASSETS[name] = url
+
+
+def asset_path(name):
+    return LOTTIE_DIR / f'{name}.json'
+
+
+def fetch_lottie(name, timeout=10):
+    """Download ``name`` from its registered URL and store it on disk."""
+    import requests
+
+    url = LOTTIE_ASSETS.get(name)
+    if url is None:
+        raise KeyError(f'No URL registered for Lottie asset {name!r}')
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    animation = response.json()
+    path = asset_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_bytes(path, json.dumps(animation).encode('utf-8'))
+    return animation
+
+
+def load_lottie(name):
+    """Return the animation JSON for ``name``, or ``None`` if it is not on disk.
+
+    Only loaded animations are remembered, so one vendored while the app
+    runs is shown on the next render.
+    """
+    with _lock:
+        if name in _memory:
+            return _memory[name]
+
+    try:
+        animation = json.loads(asset_path(name).read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        _memory[name] = animation
+    return animation
+
+
+def main(argv=None):
+    names = (argv if argv is not None else sys.argv[1:]) or [
+        name for name, url in LOTTIE_ASSETS.items() if url]
+    for name in names:
+        fetch_lottie(name)
+        print(f'{name}: {asset_path(name)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
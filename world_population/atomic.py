@@ -0,0 +1,39 @@
+"""Atomic writes for the files under ``.cache/``.
+
+A file is written under a temporary name unique to the process and thread,
+then renamed over its target, so readers never map a half-written file and
+two sessions (or warm-up workers) writing the same file do not collide.
+"""
+import os
+import threading
+
+
+def temp_path(path):
+    """Return the temporary sibling of ``path`` for this process and thread."""
+    return path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+
+def write_atomic(path, write):
+    """Call ``write(tmp_path)``, then move the file it wrote to ``path``."""
+    tmp_path = temp_path(path)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_bytes(path, data):
+    write_atomic(path, lambda tmp_path: tmp_path.write_bytes(data))
+
+
+def write_arrow(path, table):
+    """Write ``table`` to ``path`` as an uncompressed (mappable) Arrow IPC file."""
+    import pyarrow as pa
+
+    def write(tmp_path):
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    write_atomic(path, write)
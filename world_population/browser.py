@@ -0,0 +1,76 @@
+"""Server-side paging for the Dataset page.
+
+Filtering and sorting run against the cached frames and produce an array of
+row positions, which is itself cached per (dataset, filter, sort); turning a
+page only slices that array.  Only the visible page, restricted to the
+projected columns, is handed to ``st.dataframe``.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from world_population.cache import LRUCache
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Row positions after filter + sort, keyed on (dataset key, filter, sort)
+row_order_cache = LRUCache(maxsize=64, ttl=30 * 60)
+
+
+def filter_mask(series, text):
+    """Return the rows of ``series`` matching the filter ``text``.
+
+    Text columns match case-insensitively on substrings (categoricals test
+    each category once and then compare codes); numeric columns match the
+    value exactly.
+    """
+    text = text.strip()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(str)
+        matching = np.flatnonzero(categories.str.contains(text, case=False, regex=False))
+        return np.isin(series.cat.codes.to_numpy(), matching)
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            value = float(text)
+        except ValueError:
+            return np.zeros(len(series), dtype=bool)
+        return series.to_numpy() == value
+    return series.astype(str).str.contains(text, case=False, regex=False).to_numpy()
+
+
+def row_order(df, dataset_key, filter_column=None, filter_text='', sort_by=None, ascending=True):
+    """Return the row positions of ``df`` after filtering and sorting."""
+    filter_text = filter_text.strip() if filter_column else ''
+    key = (dataset_key, filter_column, filter_text, sort_by, ascending)
+
+    def compute():
+        positions = np.arange(len(df))
+        if filter_text:
+            positions = positions[filter_mask(df[filter_column], filter_text)]
+        if sort_by is not None:
+            values = df[sort_by].iloc[positions]
+            order = np.argsort(values.to_numpy() if not isinstance(values.dtype, pd.CategoricalDtype)
+                               else values.astype(str).to_numpy(), kind='stable')
+            if not ascending:
+                order = order[::-1]
+            positions = positions[order]
+        return positions
+
+    return row_order_cache.get_or_create(key, compute)
+
+
+def query_page(df, dataset_key, columns=None, filter_column=None, filter_text='',
+               sort_by=None, ascending=True, page=1, page_size=50):
+    """Return ``(page_df, total_rows, page_count)`` for one page of ``df``.
+
+    ``page`` is 1-based and clamped to the available pages.
+    """
+    positions = row_order(df, dataset_key, filter_column, filter_text, sort_by, ascending)
+    total_rows = len(positions)
+    page_count = max(1, math.ceil(total_rows / page_size))
+    page = min(max(1, page), page_count)
+    start = (page - 1) * page_size
+    visible = positions[start:start + page_size]
+    columns = list(columns) if columns else list(df.columns)
+    return df.iloc[visible, df.columns.get_indexer(columns)], total_rows, page_count
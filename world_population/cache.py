@@ -0,0 +1,111 @@
+"""Small in-process caches shared by every Streamlit session."""
+import collections
+import threading
+import time
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and entry age.
+
+    ``maxsize`` caps the number of entries (least recently used are evicted
+    first) and ``ttl`` is the default lifetime of an entry in seconds
+    (``None`` keeps entries until they are pushed out); :meth:`put` can
+    override it per entry.  ``maxbytes`` additionally caps the total
+    ``sizeof(value)`` of the entries; a value larger than that on its own
+    is not stored.  Hit, miss and eviction counters are exposed through
+    :meth:`stats`.
+    """
+
+    def __init__(self, maxsize=128, ttl=None, clock=time.monotonic, maxbytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._sizes = {}
+        self.nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires is None or expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value, ttl=_MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires = None if ttl is None else self._clock() + ttl
+        size = self._sizeof(value) if self.maxbytes is not None else 0
+        with self._lock:
+            self._remove(key)
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._entries[key] = (value, expires)
+            self._sizes[key] = size
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or (
+                    self.maxbytes is not None and self.nbytes > self.maxbytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        # Caller holds the lock
+        entry = self._entries.pop(key, _MISSING)
+        self.nbytes -= self._sizes.pop(key, 0)
+        return entry
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for ``key``, calling ``factory`` on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            # Built outside the lock: two sessions missing the same key at
+            # once both build it, which is cheaper than serialising all
+            # builds behind one lock.
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._remove(key)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            return entry is not _MISSING and (entry[1] is None or entry[1] > self._clock())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'nbytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
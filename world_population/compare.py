@@ -0,0 +1,98 @@
+"""Side-by-side comparison of several countries over several years.
+
+:func:`compare` answers a whole comparison in one pass over
+``df_reshaped``: one mask on the category codes and years selects the
+cells, they are scattered into a (country, year) matrix, and the changes
+between consecutive selected years, the compound annual growth rate and an
+index against the first selected year are computed on that matrix.  Cost
+grows with the number of selected cells, whatever the number of countries.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from world_population.cache import LRUCache
+from world_population.data import WORKBOOK_PATH, file_signature
+
+METRICS = {
+    'population': 'Population',
+    'index': 'Index (first year = 100)',
+    'pct_change': 'Change since previous year (%)',
+    'cagr': 'Per year since previous year (%)',
+}
+
+# Comparison frames keyed on (workbook signature, countries, years, annual)
+comparison_cache = LRUCache(maxsize=128, ttl=60 * 60)
+
+
+def compare(df_reshaped, countries, years):
+    """Return one row per selected (country, year) with series and deltas.
+
+    Columns: ``country``, ``year``, ``population``, ``previous_year``,
+    ``abs_change``, ``pct_change`` and ``cagr`` (against the previous
+    selected year) and ``index`` (population as a percentage of the first
+    selected year's).
+    """
+    countries = list(dict.fromkeys(countries))
+    years = np.array(sorted(set(int(year) for year in years)), dtype='int64')
+    categories = df_reshaped['country'].cat.categories
+    codes = categories.get_indexer(countries)
+    countries = [country for country, code in zip(countries, codes) if code >= 0]
+    codes = codes[codes >= 0]
+    if not len(countries) or not len(years):
+        return pd.DataFrame(columns=['country', 'year', 'population', 'previous_year', 'abs_change',
+                                     'pct_change', 'cagr', 'index'])
+
+    # Row position of each category code among the selected countries
+    positions = np.full(len(categories), -1)
+    positions[codes] = np.arange(len(codes))
+    row_codes = df_reshaped['country'].cat.codes.to_numpy()
+    row_years = df_reshaped['year'].to_numpy()
+    mask = (positions[row_codes] >= 0) & np.isin(row_years, years) & (row_codes >= 0)
+
+    matrix = np.full((len(codes), len(years)), np.nan)
+    matrix[positions[row_codes[mask]], np.searchsorted(years, row_years[mask])] = (
+        df_reshaped['population'].to_numpy(dtype='float64')[mask])
+
+    previous = np.concatenate([np.full((len(codes), 1), np.nan), matrix[:, :-1]], axis=1)
+    gaps = np.concatenate([[np.nan], np.diff(years)]).astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = np.where(previous > 0, (matrix / previous - 1) * 100, np.nan)
+        cagr = np.where(previous > 0, (np.power(matrix / previous, 1 / gaps) - 1) * 100, np.nan)
+        index = np.where(matrix[:, :1] > 0, matrix / matrix[:, :1] * 100, np.nan)
+
+    n_years = len(years)
+    return pd.DataFrame({
+        'country': np.repeat(countries, n_years),
+        'year': np.tile(years, len(countries)),
+        'population': matrix.reshape(-1),
+        'previous_year': np.tile(np.concatenate([[np.nan], years[:-1]]), len(countries)),
+        'abs_change': (matrix - previous).reshape(-1),
+        'pct_change': pct_change.reshape(-1),
+        'cagr': cagr.reshape(-1),
+        'index': index.reshape(-1),
+    })
+
+
+def cached_compare(df_reshaped, countries, years, annual=False):
+    """Return :func:`compare` through :data:`comparison_cache`."""
+    key = (file_signature(WORKBOOK_PATH), tuple(countries), tuple(sorted(years)), annual)
+    return comparison_cache.get_or_create(key, lambda: compare(df_reshaped, countries, years))
+
+
+def build_comparison_figure(comparison, metric='population'):
+    """Return one figure with a trace per country for ``metric``."""
+    figure = go.Figure()
+    for country, rows in comparison.groupby('country', sort=False):
+        figure.add_trace(go.Scatter(x=rows['year'], y=rows[metric], name=country, mode='lines+markers'))
+    figure.update_layout(
+        template='plotly_dark',
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        margin=dict(l=0, r=0, t=10, b=0),
+        height=360,
+        yaxis_title=METRICS[metric],
+        xaxis_title='Year',
+        hovermode='x unified',
+    )
+    return figure
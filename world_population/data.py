@@ -0,0 +1,290 @@
+"""Data loading for the World Population app.
+
+``World Population.xlsx`` is parsed with openpyxl only once: the parsed
+frame is written to an Arrow IPC sidecar in ``.cache/`` keyed on the
+workbook's mtime, size and SHA-256.  Later processes memory-map the sidecar
+instead of re-reading Excel, and the wide and long frames are memoized per
+process so a Streamlit rerun never touches the workbook.
+"""
+import functools
+import hashlib
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from world_population import perf
+from world_population.atomic import write_arrow
+from world_population.geo import resolve_iso3
+from world_population.interpolate import interpolate_annual
+from world_population.ingest import STORE_DIR, detect_year_columns, ingest_workbook, load_long_store, melt_years
+from world_population.registry import DatasetRegistry
+
+BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
+CACHE_DIR = BASE_DIR / '.cache'
+WORKBOOK_PATH = BASE_DIR / 'World Population.xlsx'
+WORLDPOP_PATH = BASE_DIR / 'worldpop.csv'
+
+# Process-wide store of the loaded frames, shared by every session
+datasets = DatasetRegistry()
+
+_META_MTIME = b'source_mtime_ns'
+_META_SIZE = b'source_size'
+_META_DIGEST = b'source_sha256'
+
+
+def file_signature(path):
+    """Return the cheap ``(mtime_ns, size)`` fingerprint of ``path``."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of ``path``."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=16)
+def _digest_for(path, signature):
+    return file_digest(path)
+
+
+def file_version(path):
+    """Return the content digest of ``path``, recomputed only when it changes.
+
+    Unlike :func:`file_signature` it is the same on every machine holding
+    the same file, so it can key results shared between app replicas.
+    """
+    return _digest_for(str(path), file_signature(path))
+
+
+def sidecar_path(source):
+    """Return the Arrow sidecar location for ``source``."""
+    return CACHE_DIR / (pathlib.Path(source).name + '.arrow')
+
+
+def _normalize_for_arrow(df):
+    # Excel columns occasionally mix numbers with placeholders such as '...'
+    # (e.g. fert_rate); Arrow needs one type per column, so treat those
+    # placeholders as missing values.
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == object:
+            numeric = pd.to_numeric(df[column], errors='coerce')
+            if numeric.notna().sum() >= df[column].notna().sum() / 2:
+                df[column] = numeric
+            else:
+                df[column] = df[column].astype(str)
+    df.columns = [str(column) for column in df.columns]
+    return df
+
+
+def _write_sidecar(table, path, signature, digest):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update({
+        _META_MTIME: str(signature[0]).encode(),
+        _META_SIZE: str(signature[1]).encode(),
+        _META_DIGEST: digest.encode(),
+    })
+    write_arrow(path, table.replace_schema_metadata(metadata))
+
+
+def _map_sidecar(path):
+    # Uncompressed IPC files can be mapped directly: the buffers are backed
+    # by the page cache and shared between worker processes.
+    with pa.memory_map(str(path), 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def load_table(source, reader):
+    """Return ``source`` as an Arrow table, using the sidecar when it is fresh.
+
+    ``reader`` is called with the source path to parse it when the sidecar is
+    missing or stale.  A changed mtime with unchanged content (e.g. after a
+    ``git checkout``) only refreshes the sidecar metadata.
+    """
+    source = pathlib.Path(source)
+    signature = file_signature(source)
+    path = sidecar_path(source)
+
+    if path.exists():
+        try:
+            table = _map_sidecar(path)
+        except (OSError, pa.ArrowInvalid):
+            table = None
+        if table is not None:
+            metadata = table.schema.metadata or {}
+            cached_signature = (int(metadata.get(_META_MTIME, b'-1')),
+                                int(metadata.get(_META_SIZE, b'-1')))
+            if cached_signature == signature:
+                return table
+            digest = file_digest(source)
+            if metadata.get(_META_DIGEST) == digest.encode():
+                _write_sidecar(table, path, signature, digest)
+                return table
+
+    digest = file_digest(source)
+    df = _normalize_for_arrow(reader(source))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    _write_sidecar(table, path, signature, digest)
+    return _map_sidecar(path)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_merged(path, signature):
+    with perf.span('excel_load') as span:
+        merged_df = load_table(path, pd.read_excel).to_pandas()
+        span.output = merged_df
+    return merged_df
+
+
+def melt_workbook(merged_df):
+    """Melt the wide workbook frame into one row per (country, year).
+
+    Every four-digit column of the workbook is treated as a year.
+    """
+    return melt_years(merged_df, detect_year_columns(merged_df.columns))
+
+
+def compact_reshaped(df):
+    """Return ``df`` with the compact Dashboard schema.
+
+    ``year`` becomes a small integer, ``country`` and ``continent`` become
+    categoricals (so equality filters compare integer codes) and
+    ``population`` a fixed-width integer whenever no value is missing (the
+    workbook's float columns carry sub-person noise such as 64889.0000001,
+    which is rounded away).  ``iso3`` holds each country's ISO-3 code for
+    the map (missing for names :mod:`world_population.geo` cannot resolve).
+    """
+    population = df['population']
+    if population.notna().all():
+        population = population.round().astype('int64')
+    else:
+        population = population.astype('float64')
+    country = df['country'].astype('category')
+    iso3_codes, _ = resolve_iso3(country.cat.categories)
+    return pd.DataFrame({
+        'country': country,
+        'continent': df['continent'].astype('category'),
+        'year': pd.to_numeric(df['year']).astype('int16'),
+        'population': population,
+        'iso3': country.map(iso3_codes).astype('category'),
+    })
+
+
+@functools.lru_cache(maxsize=4)
+def _load_reshaped(path, signature):
+    merged_df = _load_merged(path, signature)
+    # Only the (country, year) cells that changed since the last run are
+    # written; an unchanged workbook leaves the store untouched and loading
+    # it maps a single base file
+    with perf.span('ingest'):
+        ingest_workbook(merged_df, pathlib.Path(path).name, long_store_dir(path))
+    with perf.span('melt') as span:
+        df_reshaped = compact_reshaped(load_long_store(long_store_dir(path)))
+        span.output = df_reshaped
+    return df_reshaped
+
+
+def long_store_dir(path=WORKBOOK_PATH):
+    """Return the long-format store directory for the workbook at ``path``."""
+    if pathlib.Path(path) == WORKBOOK_PATH:
+        return STORE_DIR
+    return CACHE_DIR / f'long_store-{pathlib.Path(path).stem}'
+
+
+def _shared(kind, path, loader):
+    # One registry entry per (dataset, file); sessions get read-only views
+    path = str(path)
+    name = f'{kind}:{pathlib.Path(path).name}'
+    datasets.ensure(name, lambda: loader(path, file_signature(path)), lambda: file_signature(path))
+    return datasets.get(name)
+
+
+def load_merged_df(path=WORKBOOK_PATH):
+    """Return the wide workbook frame (one row per country)."""
+    return _shared('merged', path, _load_merged)
+
+
+def load_reshaped_df(path=WORKBOOK_PATH):
+    """Return the long (country, continent, year, population) frame."""
+    return _shared('reshaped', path, _load_reshaped)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_annual(path, signature):
+    with perf.span('interpolate') as span:
+        df_annual = interpolate_annual(_load_reshaped(path, signature))
+        span.output = df_annual
+    return df_annual
+
+
+def load_annual_df(path=WORKBOOK_PATH):
+    """Return :func:`load_reshaped_df` interpolated to every year.
+
+    Rows that are not in the workbook have ``interpolated=True``.
+    """
+    return _shared('annual', path, _load_annual)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_worldpop(path, signature):
+    return pd.read_csv(path, dtype={'Year': str})
+
+
+def load_worldpop_df(path=WORLDPOP_PATH):
+    """Return ``worldpop.csv`` (with ``Year`` kept as text for the story axis)."""
+    return _shared('worldpop', path, _load_worldpop)
+
+
+@functools.lru_cache(maxsize=4)
+def _reshaped_memory_usage(path, signature):
+    plain = melt_workbook(_load_merged(path, signature)).astype(
+        {'country': object, 'continent': object, 'year': object})
+    compact = _load_reshaped(path, signature)
+    return (int(plain.memory_usage(deep=True).sum()),
+            int(compact.memory_usage(deep=True).sum()))
+
+
+def reshaped_memory_usage(path=WORKBOOK_PATH):
+    """Return ``(object_bytes, compact_bytes)`` for one copy of ``df_reshaped``.
+
+    ``object_bytes`` is the deep size of the plain melt (string years and
+    object labels); ``compact_bytes`` that of :func:`load_reshaped_df`.
+    Both are measured once per workbook version.
+    """
+    return _reshaped_memory_usage(str(path), file_signature(path))
+
+
+def category_mask(series, value):
+    """Return a boolean mask of ``series == value`` computed on category codes."""
+    try:
+        code = series.cat.categories.get_loc(value)
+    except KeyError:
+        return np.zeros(len(series), dtype=bool)
+    return series.cat.codes.to_numpy() == code
+
+
+def select_rows(df, year='All', continent='All', country='All'):
+    """Filter ``df_reshaped`` to a sidebar selection (``'All'`` = no filter)."""
+    mask = np.ones(len(df), dtype=bool)
+    if year != 'All':
+        mask &= df['year'].to_numpy() == year
+    if continent != 'All':
+        mask &= category_mask(df['continent'], continent)
+    if country != 'All':
+        mask &= category_mask(df['country'], country)
+    return df[mask]
+
+
+def used_categories(series):
+    """Return the sorted labels actually present in a categorical ``series``."""
+    codes = np.unique(series.cat.codes.to_numpy())
+    return sorted(series.cat.categories[codes[codes >= 0]])
@@ -0,0 +1,195 @@
+"""Population density map drawn with pydeck from bundled country shapes.
+
+``country_boundaries.geojson`` holds the Natural Earth 1:110m admin-0
+boundaries (public domain), reduced to name, ISO-3 code and geometry.  It is
+read with geopandas once per version of the file, simplified at each level
+of detail in :data:`LODS` and written, one row per polygon, to an Arrow file
+under ``.cache/geometry/``.  Later processes memory-map that file, and each
+level is turned into pydeck-ready polygon lists once per process.  A rerun
+only computes the density column (population / land area for the selected
+year, joined by ISO-3) and the fill colors.
+
+Countries too small for the 1:110m data (mostly islands) have no shape and
+are listed by :func:`unmapped_countries`.
+"""
+import functools
+import pathlib
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from world_population import perf
+from world_population.atomic import write_arrow
+from world_population.data import BASE_DIR, CACHE_DIR, file_signature, file_version, select_rows
+
+BOUNDARIES_PATH = BASE_DIR / 'country_boundaries.geojson'
+GEOMETRY_CACHE_DIR = CACHE_DIR / 'geometry'
+
+# Simplification tolerance (degrees) per level of detail
+LODS = {'low': 0.5, 'medium': 0.15, 'high': 0.0}
+
+_build_lock = threading.Lock()
+
+
+def lod_for(selected_continent, selected_country):
+    """Return the level of detail for a sidebar selection."""
+    if selected_country != 'All':
+        return 'high'
+    return 'low' if selected_continent == 'All' else 'medium'
+
+
+def _cache_path(path):
+    return GEOMETRY_CACHE_DIR / f'{path.stem}-{file_version(path)[:16]}.arrow'
+
+
+def build_geometry_table(path=BOUNDARIES_PATH):
+    """Return the simplified polygons of every LOD as an Arrow table."""
+    import geopandas as gpd
+
+    boundaries = gpd.read_file(path)
+    frames = []
+    for lod, tolerance in LODS.items():
+        shapes = boundaries[['iso3', 'name', 'geometry']].copy()
+        if tolerance:
+            shapes['geometry'] = shapes.geometry.simplify(tolerance, preserve_topology=True)
+        shapes = shapes[~shapes.geometry.is_empty].explode(index_parts=False)
+        frames.append(pd.DataFrame({
+            'lod': lod,
+            'iso3': shapes['iso3'].to_numpy(),
+            'name': shapes['name'].to_numpy(),
+            # Exterior ring first, then holes; [lon, lat] pairs
+            'polygon': [[np.asarray(ring.coords, dtype='float32')[:, :2].tolist()
+                         for ring in [polygon.exterior, *polygon.interiors]]
+                        for polygon in shapes.geometry],
+        }))
+    frame = pd.concat(frames, ignore_index=True)
+    schema = pa.schema([
+        ('lod', pa.string()),
+        ('iso3', pa.string()),
+        ('name', pa.string()),
+        ('polygon', pa.list_(pa.list_(pa.list_(pa.float32(), 2)))),
+    ])
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+
+def load_geometry_table(path=BOUNDARIES_PATH):
+    """Return the geometry table, building its binary cache if needed."""
+    cache_path = _cache_path(path)
+    # Sessions toggling the density map on a cold deploy build it once
+    with _build_lock:
+        if not cache_path.exists():
+            with perf.span('geometry_build'):
+                table = build_geometry_table(path)
+            GEOMETRY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            write_arrow(cache_path, table)
+            # Drop the caches of older versions of the boundary file
+            for stale in GEOMETRY_CACHE_DIR.glob(f'{path.stem}-*.arrow'):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+    with pa.memory_map(str(cache_path), 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+@functools.lru_cache(maxsize=len(LODS) * 2)
+def _load_shapes(path, signature, lod):
+    table = load_geometry_table(pathlib.Path(path))
+    table = table.filter(pc.equal(table['lod'], lod))
+    polygons = table['polygon'].to_pylist()
+    # Outline area (square degrees) and bounds, for framing the view
+    outlines = [np.asarray(polygon[0], dtype='float64') for polygon in polygons]
+    area = [abs(np.dot(ring[:, 0], np.roll(ring[:, 1], 1)) - np.dot(ring[:, 1], np.roll(ring[:, 0], 1))) / 2
+            for ring in outlines]
+    return pd.DataFrame({
+        'iso3': table['iso3'].to_numpy(zero_copy_only=False),
+        'name': table['name'].to_numpy(zero_copy_only=False),
+        'polygon': polygons,
+        'area': area,
+        'bounds': [np.concatenate([ring.min(axis=0), ring.max(axis=0)]) for ring in outlines],
+    })
+
+
+def load_shapes(lod, path=BOUNDARIES_PATH):
+    """Return the ``iso3`` / ``name`` / ``polygon`` rows of one LOD (shared, read-only)."""
+    return _load_shapes(str(path), file_signature(path), lod)
+
+
+def density_by_iso3(df_reshaped, merged_df, selected_year):
+    """Return population per km² for ``selected_year``, indexed by ISO-3 code."""
+    rows = select_rows(df_reshaped, selected_year)
+    land_area = merged_df.set_index('country')['land_area']
+    area = land_area.reindex(rows['country'].astype(str)).to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = rows['population'].to_numpy(dtype='float64') / np.where(area > 0, area, np.nan)
+    return pd.Series(density, index=rows['iso3'].astype(str).to_numpy()).dropna()
+
+
+def fill_colors(values, color_theme):
+    """Return ``[r, g, b, a]`` per value on a log scale of ``color_theme``."""
+    import plotly.colors
+
+    logs = np.log10(np.clip(values, 1e-3, None))
+    low, high = (np.nanmin(logs), np.nanmax(logs)) if len(logs) else (0.0, 1.0)
+    positions = (logs - low) / (high - low) if high > low else np.zeros_like(logs)
+    colors = plotly.colors.sample_colorscale(
+        plotly.colors.get_colorscale(color_theme), np.nan_to_num(positions).tolist(), colortype='tuple')
+    return [[int(r * 255), int(g * 255), int(b * 255), 200] for r, g, b in colors]
+
+
+def density_frame(df_reshaped, merged_df, selected_year, selected_continent, selected_country,
+                  color_theme, lod=None):
+    """Return the shapes of a selection joined to their density and color."""
+    lod = lod or lod_for(selected_continent, selected_country)
+    selection = select_rows(df_reshaped, selected_year, selected_continent, selected_country)
+    density = density_by_iso3(df_reshaped, merged_df, selected_year)
+    density = density[density.index.isin(selection['iso3'].astype(str))]
+
+    shapes = load_shapes(lod)
+    values = density.reindex(shapes['iso3']).to_numpy()
+    keep = ~np.isnan(values)
+    frame = shapes[keep].assign(density=np.round(values[keep], 1))
+    frame['color'] = fill_colors(frame['density'].to_numpy(), color_theme)
+    return frame
+
+
+def build_density_deck(frame, selected_continent):
+    """Return the pydeck ``Deck`` for :func:`density_frame` rows."""
+    import pydeck as pdk
+
+    if frame.empty:
+        return None
+    layer = pdk.Layer(
+        'PolygonLayer',
+        frame[['name', 'polygon', 'density', 'color']],
+        get_polygon='polygon',
+        get_fill_color='color',
+        get_line_color=[40, 40, 40, 160],
+        line_width_min_pixels=0.5,
+        pickable=True,
+        auto_highlight=True,
+    )
+    if selected_continent == 'All':
+        view = pdk.ViewState(latitude=20, longitude=0, zoom=0.6)
+    else:
+        # Frame the largest outlines making up 90% of the area, so far-flung
+        # territories and islands do not pull the view away
+        largest = frame.sort_values('area', ascending=False)
+        covered = largest['area'].cumsum() <= largest['area'].sum() * 0.9
+        covered.iloc[0] = True
+        bounds = np.stack(largest.loc[covered.to_numpy(), 'bounds'].to_numpy())
+        low, high = bounds[:, :2].min(axis=0), bounds[:, 2:].max(axis=0)
+        longitude, latitude = (low + high) / 2
+        span = float((high - low).max())
+        view = pdk.ViewState(latitude=float(latitude), longitude=float(longitude),
+                             zoom=float(np.clip(np.log2(360 / max(span, 1e-3)), 0.5, 8)))
+    return pdk.Deck(layers=[layer], initial_view_state=view, map_style=None,
+                    tooltip={'text': '{name}\n{density} people per km²'})
+
+
+def unmapped_countries(df_reshaped, path=BOUNDARIES_PATH):
+    """Return the countries of ``df_reshaped`` without a shape."""
+    mapped = set(load_shapes('high', path)['iso3'])
+    countries = df_reshaped.drop_duplicates('country')
+    return sorted(countries.loc[~countries['iso3'].astype(str).isin(mapped), 'country'].astype(str))
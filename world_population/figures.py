@@ -0,0 +1,128 @@
+"""Plotly figures for the Dashboard, cached across reruns and sessions."""
+import plotly.express as px
+
+from world_population.cache import LRUCache
+from world_population.data import WORKBOOK_PATH, file_signature, file_version, select_rows
+from world_population.shared_cache import SharedCache
+
+# Countries are plotted by ISO-3 code (resolved once at load time, see
+# world_population.geo) rather than by name.
+
+# Finished choropleths keyed on (workbook signature, year, continent,
+# country, color theme).  Flipping between selections is a dictionary hit
+# instead of a fresh px.choropleth call with name geocoding and layout.
+choropleth_cache = LRUCache(maxsize=256, ttl=60 * 60)
+
+# Behind the memory cache, figures go to the shared cache backend (see
+# world_population.shared_cache) keyed on the workbook's content digest, so
+# other processes and replicas, or one warmed up by world_population.warmup,
+# read them instead of rebuilding.
+# Bump when build_choropleth, build_animated_choropleth or _style change
+FIGURE_CACHE_VERSION = 1
+FIGURE_TTL = 7 * 24 * 60 * 60
+shared_figures = SharedCache('choropleth', ttl=FIGURE_TTL, version=FIGURE_CACHE_VERSION)
+
+COLOR_THEMES = ['blues', 'cividis', 'greens', 'inferno', 'magma', 'plasma', 'reds', 'rainbow', 'turbo', 'viridis']
+
+
+def build_choropleth(input_df, selected_year, selected_continent, selected_country, input_color_theme):
+    """Return the choropleth for a sidebar selection, or ``None`` when empty."""
+    # Filter the data based on the selected year, continent, and country
+    input_df = select_rows(input_df, selected_year, selected_continent, selected_country)
+    if selected_continent == 'All':
+        scope = 'world'  # Set scope to 'world' if all continents selected
+    else:
+        scope = selected_continent.lower()  # Convert continent to lowercase for matching valid options
+
+    if input_df.empty:
+        return None
+
+    choropleth = px.choropleth(input_df,
+        locations='iso3',
+        color='population',
+        locationmode="ISO-3",
+        hover_name='country',
+        hover_data=_hover_data(input_df),
+        color_continuous_scale=input_color_theme,
+        range_color=(0, max(input_df.population)),
+        scope=scope,  # Set scope dynamically
+        labels={'population': 'Population'}
+    )
+    return _style(choropleth)
+
+
+def build_animated_choropleth(input_df, selected_continent, selected_country, input_color_theme):
+    """Return one choropleth with every year as an animation frame.
+
+    All frames share one color range (0 to the largest population in the
+    selection across years), so the colors are comparable while playing.
+    The frames are shipped to the browser once and played back there.
+    """
+    input_df = select_rows(input_df, 'All', selected_continent, selected_country)
+    if input_df.empty:
+        return None
+    input_df = input_df.sort_values('year', kind='stable')
+    scope = 'world' if selected_continent == 'All' else selected_continent.lower()
+
+    choropleth = px.choropleth(input_df,
+        locations='iso3',
+        color='population',
+        locationmode="ISO-3",
+        hover_name='country',
+        hover_data=_hover_data(input_df),
+        animation_frame='year',
+        color_continuous_scale=input_color_theme,
+        range_color=(0, max(input_df.population)),
+        scope=scope,
+        labels={'population': 'Population', 'year': 'Year'}
+    )
+    choropleth = _style(choropleth)
+    # Leave room for the play button and year slider under the map
+    choropleth.update_layout(height=360, margin=dict(l=0, r=0, t=0, b=40))
+    return choropleth
+
+
+def _hover_data(input_df):
+    # Flag interpolated values when plotting the annual series
+    return ['interpolated'] if 'interpolated' in input_df.columns else None
+
+
+def _style(choropleth):
+    choropleth.update_layout(
+        template='plotly_dark',
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=280
+    )
+    return choropleth
+
+
+def _load_or_build(key, build):
+    # The shared key swaps the mtime-based signature for the content digest
+    return shared_figures.get_or_create((file_version(WORKBOOK_PATH),) + key[1:], build)
+
+
+def cached_choropleth(input_df, selected_year, selected_continent, selected_country, input_color_theme,
+                      annual=False):
+    """Return :func:`build_choropleth` through :data:`choropleth_cache`.
+
+    ``annual`` tells figures of the interpolated annual frame apart from
+    the workbook's.  Cached figures are shared between sessions and must
+    not be mutated.
+    """
+    key = (file_signature(WORKBOOK_PATH), selected_year, selected_continent,
+           selected_country, input_color_theme) + (('annual',) if annual else ())
+    return choropleth_cache.get_or_create(
+        key, lambda: _load_or_build(key, lambda: build_choropleth(
+            input_df, selected_year, selected_continent, selected_country, input_color_theme)))
+
+
+def cached_animated_choropleth(input_df, selected_continent, selected_country, input_color_theme,
+                               annual=False):
+    """Return :func:`build_animated_choropleth` through :data:`choropleth_cache`."""
+    key = (file_signature(WORKBOOK_PATH), 'animated', selected_continent,
+           selected_country, input_color_theme) + (('annual',) if annual else ())
+    return choropleth_cache.get_or_create(
+        key, lambda: _load_or_build(key, lambda: build_animated_choropleth(
+            input_df, selected_continent, selected_country, input_color_theme)))
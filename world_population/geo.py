@@ -0,0 +1,115 @@
+"""Country name -> ISO-3 code index for the map.
+
+With ``locationmode="country names"`` Plotly resolves every name on every
+render and silently drops the ones it does not know.  Instead the names in
+``World Population.xlsx`` and ``World Population - Mod.csv`` are resolved
+once against ``country_iso3.csv`` (ISO 3166 names, official names and
+common names) plus :data:`ALIASES`, and the map plots by ISO-3 code.  Names
+that resolve to nothing are reported by :func:`load_iso3_index` and
+``python -m world_population.geo``.
+"""
+import csv
+import functools
+import pathlib
+import sys
+
+BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
+ISO3_TABLE_PATH = BASE_DIR / 'country_iso3.csv'
+MOD_CSV_PATH = BASE_DIR / 'World Population - Mod.csv'
+
+# Spellings used by the datasets that differ from the ISO 3166 names
+ALIASES = {
+    'Brunei': 'BRN',
+    'Cape Verde': 'CPV',
+    'Czech Republic': 'CZE',
+    'DR Congo': 'COD',
+    'East Timor': 'TLS',
+    'Falkland Islands': 'FLK',
+    'Ivory Coast': 'CIV',
+    'Kosovo': 'XKX',
+    'Macedonia': 'MKD',
+    'Micronesia': 'FSM',
+    'Republic of the Congo': 'COG',
+    'Russia': 'RUS',
+    'Saint Barthelemy': 'BLM',
+    'Saint Martin': 'MAF',
+    'Saint Pierre & Miquelon': 'SPM',
+    'Sint Maarten': 'SXM',
+    'Swaziland': 'SWZ',
+    'Turkey': 'TUR',
+    'Vatican City': 'VAT',
+}
+
+
+def _normalize(name):
+    return ' '.join(str(name).replace('&', 'and').split()).casefold()
+
+
+@functools.lru_cache(maxsize=1)
+def iso3_table():
+    """Return ``{normalized name: ISO-3}`` from the bundled table and aliases."""
+    table = {}
+    with open(ISO3_TABLE_PATH, newline='', encoding='utf-8') as fh:
+        for row in csv.DictReader(fh):
+            table[_normalize(row['name'])] = row['iso3']
+    for name, code in ALIASES.items():
+        table[_normalize(name)] = code
+    return table
+
+
+def resolve_iso3(names):
+    """Return ``(codes, unresolved)`` for an iterable of country names.
+
+    ``codes`` maps each resolvable name to its ISO-3 code; ``unresolved`` is
+    the sorted list of names that matched nothing.
+    """
+    table = iso3_table()
+    codes = {}
+    unresolved = set()
+    for name in set(names):
+        code = table.get(_normalize(name))
+        if code is None:
+            unresolved.add(name)
+        else:
+            codes[name] = code
+    return codes, sorted(unresolved)
+
+
+class CountryIndex:
+    """The resolved ISO-3 codes of the app's datasets."""
+
+    def __init__(self, codes, unresolved, sources):
+        self.codes = codes
+        self.unresolved = unresolved
+        self.sources = sources
+
+    def __len__(self):
+        return len(self.codes)
+
+
+@functools.lru_cache(maxsize=1)
+def load_iso3_index():
+    """Return the :class:`CountryIndex` for both country datasets."""
+    import pandas as pd
+
+    from world_population.data import load_merged_df
+
+    sources = {
+        'World Population.xlsx': set(load_merged_df()['country']),
+        MOD_CSV_PATH.name: set(pd.read_csv(MOD_CSV_PATH, usecols=['country'])['country']),
+    }
+    codes, unresolved = resolve_iso3(set().union(*sources.values()))
+    return CountryIndex(codes, unresolved, {
+        source: sorted(set(names) & set(unresolved)) for source, names in sources.items()})
+
+
+def main():
+    index = load_iso3_index()
+    print(f'{len(index)} country names resolved to ISO-3')
+    for source, names in index.sources.items():
+        print(f"{source}: {len(names)} unresolved{': ' + ', '.join(names) if names else ''}")
+    return 1 if index.unresolved else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Growth analytics for every country, continent and the world.
+
+One grouped, shifted pass over ``df_reshaped`` computes, for each entity
+and each pair of consecutive years in the data, the absolute and percent
+change, the compound annual growth rate over the gap (years are 1 to 20
+apart, or always 1 in the interpolated annual series) and the change in
+population rank.  The Dashboard metrics and the fastest growing / shrinking
+lists are then lookups into this table.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from world_population.data import WORKBOOK_PATH, category_mask, file_signature, load_annual_df, load_reshaped_df
+
+ALL = 'All'
+
+COLUMNS = ['level', 'continent', 'country', 'year', 'previous_year', 'population',
+           'previous_population', 'abs_change', 'pct_change', 'cagr', 'rank',
+           'previous_rank', 'rank_change']
+
+
+def _with_changes(frame, keys):
+    # frame has one row per (keys, year); rank is within the level and year
+    frame = frame.sort_values(keys + ['year'], kind='stable').reset_index(drop=True)
+    frame['rank'] = frame.groupby('year')['population'].rank(ascending=False, method='min')
+    grouped = frame.groupby(keys, observed=True, sort=False)
+    frame['previous_year'] = grouped['year'].shift().astype('Int16')
+    frame['previous_population'] = grouped['population'].shift()
+    frame['previous_rank'] = grouped['rank'].shift()
+
+    population = frame['population'].to_numpy(dtype='float64')
+    previous = frame['previous_population'].to_numpy(dtype='float64')
+    gap = (frame['year'].to_numpy(dtype='float64')
+           - frame['previous_year'].to_numpy(dtype='float64', na_value=np.nan))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frame['abs_change'] = population - previous
+        frame['pct_change'] = np.where(previous > 0, (population / previous - 1) * 100, np.nan)
+        frame['cagr'] = np.where(previous > 0, (np.power(population / previous, 1 / gap) - 1) * 100, np.nan)
+    # Positive rank_change = moved up the ranking
+    frame['rank_change'] = frame['previous_rank'] - frame['rank']
+    return frame
+
+
+def build_growth_table(df_reshaped):
+    """Return the growth table (see :data:`COLUMNS`) for ``df_reshaped``."""
+    base = df_reshaped[['continent', 'country', 'year', 'population']]
+
+    countries = _with_changes(base.assign(level='country'), ['country'])
+
+    continents = (base.groupby(['continent', 'year'], observed=True)['population'].sum()
+                  .reset_index().assign(country=ALL, level='continent'))
+    continents = _with_changes(continents, ['continent'])
+
+    world = (base.groupby('year')['population'].sum()
+             .reset_index().assign(continent=ALL, country=ALL, level='world'))
+    world = _with_changes(world, ['level'])
+
+    table = pd.concat([countries, continents, world], ignore_index=True)
+    for column in ('level', 'continent', 'country'):
+        table[column] = table[column].astype(str).astype('category')
+    return table[COLUMNS]
+
+
+class GrowthTable:
+    """The growth table plus an index of its rows by sidebar selection."""
+
+    def __init__(self, df_reshaped):
+        self.frame = build_growth_table(df_reshaped)
+        # The sidebar's year list, oldest first
+        self.years = sorted(int(year) for year in df_reshaped['year'].unique())
+        # Years of the annual series that are not in the workbook
+        self.interpolated_years = frozenset()
+        if 'interpolated' in df_reshaped.columns:
+            flagged = df_reshaped['year'].to_numpy()[df_reshaped['interpolated'].to_numpy()]
+            self.interpolated_years = frozenset(int(year) for year in np.unique(flagged))
+        self._rows = {}
+        for row in self.frame.to_dict('records'):
+            key = (int(row['year']), row['continent'], row['country'])
+            self._rows[key] = row
+            if row['level'] == 'country':
+                # The sidebar allows continent 'All' with a specific country
+                self._rows[(key[0], ALL, key[2])] = row
+
+    def lookup(self, year, continent=ALL, country=ALL):
+        """Return the row for a selection as a dict, or ``None``."""
+        return self._rows.get((year, continent, country))
+
+    def movers(self, year, continent=ALL, n=5):
+        """Return ``(fastest_growing, fastest_shrinking)`` countries for ``year``."""
+        frame = self.frame
+        mask = (category_mask(frame['level'], 'country')
+                & (frame['year'].to_numpy() == year)
+                & frame['pct_change'].notna().to_numpy())
+        if continent != ALL:
+            mask &= category_mask(frame['continent'], continent)
+        rows = frame[mask][['country', 'previous_year', 'pct_change', 'cagr', 'abs_change']]
+        return rows.nlargest(n, 'pct_change'), rows.nsmallest(n, 'pct_change')
+
+
+@functools.lru_cache(maxsize=4)
+def _load_growth(path, signature, annual):
+    return GrowthTable(load_annual_df(path) if annual else load_reshaped_df(path))
+
+
+def load_growth_table(path=WORKBOOK_PATH, annual=False):
+    """Return the memoized :class:`GrowthTable` for the workbook at ``path``.
+
+    With ``annual=True`` the table is built over the interpolated annual
+    series, so every change is against the year before.
+    """
+    return _load_growth(str(path), file_signature(path), annual)
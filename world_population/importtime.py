@@ -0,0 +1,99 @@
+"""Import-time report for the app's entry point and page modules.
+
+Run ``python -m world_population.importtime`` to import each page module
+in a fresh interpreter under ``-X importtime`` and print its cumulative
+import cost plus the slowest modules it pulled in.  ``--json`` writes the
+numbers to a file and ``--baseline`` compares against such a file, exiting
+non-zero when a page got slower than ``--tolerance`` allows.
+"""
+import argparse
+import json
+import pathlib
+import re
+import subprocess
+import sys
+
+BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+# What Python_2.py imports before any page is selected, then each page
+STARTUP = 'streamlit, streamlit_option_menu, world_population.views.performance'
+PAGES = {
+    'Home': 'world_population.views.home',
+    'Dashboard': 'world_population.views.dashboard',
+    'Story Tellings': 'world_population.views.story_tellings',
+    'Dataset': 'world_population.views.dataset',
+}
+
+_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)')
+
+
+def measure(statement, python=sys.executable):
+    """Return ``{module: cumulative_us}`` for running ``statement`` under ``-X importtime``."""
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', statement],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            cumulative[match.group(3)] = int(match.group(2))
+    return cumulative
+
+
+def report(top=5):
+    """Return ``{target: {'total_us': ..., 'slowest': [[module, us], ...]}}``.
+
+    Page modules are imported after the startup modules, as they are in the
+    app, so a page's total is only what it adds on top of startup.
+    """
+    startup = measure(f'import {STARTUP}')
+    results = {'startup': _summary(startup, sum(
+        us for name, us in startup.items() if name in STARTUP.split(', ')), top)}
+    for page, module in PAGES.items():
+        cumulative = measure(f'import {STARTUP}; import {module}')
+        own = {name: us for name, us in cumulative.items() if name not in startup}
+        results[page] = _summary(own, own.get(module, 0), top)
+    return results
+
+
+def _summary(cumulative, total, top):
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {'total_us': total, 'slowest': [[name, us] for name, us in slowest]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--baseline', help='compare against a report written with --json')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown before failing (default: 0.25)')
+    parser.add_argument('--top', type=int, default=5, help='slowest modules to list per target')
+    args = parser.parse_args(argv)
+
+    results = report(args.top)
+    for target, result in results.items():
+        print(f"{target:<15} {result['total_us'] / 1000:8.1f} ms")
+        for name, us in result['slowest']:
+            print(f"    {name:<50} {us / 1000:8.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = [
+            target for target, result in results.items()
+            if target in baseline
+            and result['total_us'] > baseline[target]['total_us'] * (1 + args.tolerance)
+        ]
+        for target in regressions:
+            print(f"REGRESSION: {target} {baseline[target]['total_us'] / 1000:.1f} ms -> "
+                  f"{results[target]['total_us'] / 1000:.1f} ms")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
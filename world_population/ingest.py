@@ -0,0 +1,262 @@
+"""Incremental ingestion of the workbook into a long-format store.
+
+Year columns are detected from the workbook header (any four-digit column
+name) instead of a hard-coded list.  The long (country, continent, year,
+population) cells are persisted under ``.cache/long_store/`` as one base
+Arrow file plus append-only delta segments, listed in a ``manifest.json``
+next to a digest of the workbook they came from.
+
+An ingestion run does nothing when the workbook digest matches the
+manifest.  Otherwise it diffs the melted workbook against the stored cells
+on (country, year) and appends one segment holding only the added and
+changed cells and tombstones for the removed ones, so a new country or a
+new year column costs time in proportion to the change.  When the deltas
+outgrow :data:`MAX_SEGMENTS` or :data:`MAX_DELTA_SHARE` of the base, they
+are folded into a new base.
+
+Ingestion and loading hold a file lock on the store directory, so
+processes sharing it neither write the same segment name nor unlink a
+segment another one is reading.
+"""
+import datetime
+import hashlib
+import json
+import pathlib
+import re
+import sys
+
+import filelock
+import pandas as pd
+import pyarrow as pa
+
+from world_population.atomic import write_arrow, write_bytes
+
+BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
+STORE_DIR = BASE_DIR / '.cache' / 'long_store'
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.lock'
+
+ID_VARS = ['country', 'continent']
+KEY = ['country', 'year']
+COLUMNS = ['country', 'continent', 'year', 'population']
+YEAR_COLUMN = re.compile(r'^\d{4}$')
+
+# Fold the deltas into a new base past this many segments, or once they
+# hold this share of the base's cells
+MAX_SEGMENTS = 8
+MAX_DELTA_SHARE = 0.25
+
+SEGMENT_SCHEMA = pa.schema([
+    ('country', pa.string()),
+    ('continent', pa.string()),
+    ('year', pa.int16()),
+    ('population', pa.float64()),
+    ('deleted', pa.bool_()),
+])
+
+
+def detect_year_columns(columns):
+    """Return the four-digit year columns of a workbook header, in order."""
+    return [str(column) for column in columns if YEAR_COLUMN.match(str(column))]
+
+
+def melt_years(merged_df, years):
+    """Return the long cells of ``merged_df`` for ``years``."""
+    long_df = merged_df.melt(id_vars=ID_VARS, value_vars=list(years),
+                             var_name='year', value_name='population')
+    long_df['year'] = long_df['year'].astype('int16')
+    return long_df
+
+
+def workbook_digest(merged_df, years):
+    """Return a digest of the identity and year columns of ``merged_df``."""
+    frame = merged_df[ID_VARS + list(years)]
+    digest = hashlib.sha256('\x1f'.join(frame.columns).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def read_manifest(store_dir=STORE_DIR):
+    path = pathlib.Path(store_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def store_lock(store_dir=STORE_DIR):
+    """Return the inter-process lock guarding ``store_dir``."""
+    store_dir = pathlib.Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    return filelock.FileLock(str(store_dir / LOCK_NAME))
+
+
+def _write_segment(path, cells):
+    write_arrow(path, pa.Table.from_pandas(cells[SEGMENT_SCHEMA.names], schema=SEGMENT_SCHEMA,
+                                           preserve_index=False))
+
+
+def _read_segment(path):
+    with pa.memory_map(str(path), 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _segment_names(manifest):
+    if 'base' not in manifest:
+        return []
+    return [manifest['base']] + [segment['name'] for segment in manifest['segments']]
+
+
+def _empty_cells():
+    return pd.DataFrame({
+        'country': pd.Series(dtype='str'),
+        'continent': pd.Series(dtype='str'),
+        'year': pd.Series(dtype='int16'),
+        'population': pd.Series(dtype='float64'),
+    })
+
+
+def _same(old, new):
+    return (old == new) | (old.isna() & new.isna())
+
+
+def diff_cells(old, new):
+    """Return the delta that turns the cells ``old`` into ``new``.
+
+    Cells are matched on (country, year).  The delta holds the added and
+    changed cells of ``new`` and a ``deleted`` tombstone per cell of
+    ``old`` missing from ``new``; its ``change`` column says which.
+    """
+    merged = old[COLUMNS].merge(new[COLUMNS], on=KEY, how='outer',
+                                suffixes=('_old', '_new'), indicator=True)
+    added = merged['_merge'] == 'right_only'
+    removed = merged['_merge'] == 'left_only'
+    changed = (merged['_merge'] == 'both') & ~(
+        _same(merged['population_old'], merged['population_new'])
+        & _same(merged['continent_old'], merged['continent_new']))
+
+    upserts = merged.loc[added | changed]
+    tombstones = merged.loc[removed]
+    return pd.DataFrame({
+        'country': pd.concat([upserts['country'], tombstones['country']], ignore_index=True),
+        'continent': pd.concat([upserts['continent_new'], tombstones['continent_old']], ignore_index=True),
+        'year': pd.concat([upserts['year'], tombstones['year']], ignore_index=True).astype('int16'),
+        'population': pd.concat([pd.to_numeric(upserts['population_new']),
+                                 pd.Series(float('nan'), index=tombstones.index)],
+                                ignore_index=True).astype('float64'),
+        'deleted': [False] * len(upserts) + [True] * len(tombstones),
+        'change': (['added' if flag else 'changed' for flag in added[added | changed]]
+                   + ['removed'] * len(tombstones)),
+    })
+
+
+def ingest_workbook(merged_df, source_name, store_dir=STORE_DIR):
+    """Bring the long store up to date with ``merged_df``; return a report.
+
+    The report lists, per touched year, how many cells were added, changed
+    and removed, the years left untouched, the years dropped from the
+    workbook and the file written (``None`` when nothing was).
+    """
+    with store_lock(store_dir):
+        return _ingest(merged_df, source_name, pathlib.Path(store_dir))
+
+
+def _ingest(merged_df, source_name, store_dir):
+    manifest = read_manifest(store_dir)
+    years = detect_year_columns(merged_df.columns)
+    digest = workbook_digest(merged_df, years)
+    report = {'source': source_name, 'years': years, 'touched': {}, 'skipped': [], 'dropped': [],
+              'written': None, 'compacted': False}
+    names = _segment_names(manifest)
+    if manifest.get('digest') == digest and names and all((store_dir / name).exists() for name in names):
+        report['skipped'] = list(years)
+        return report
+
+    old = _read_store(store_dir)
+    new = melt_years(merged_df, years)
+    delta = diff_cells(old, new)
+
+    counts = delta.groupby(['year', 'change']).size()
+    for (year, change), count in counts.items():
+        touched = report['touched'].setdefault(str(year), dict.fromkeys(['added', 'changed', 'removed'], 0))
+        touched[change] = int(count)
+    report['skipped'] = [year for year in years if year not in report['touched']]
+    report['dropped'] = sorted({str(year) for year in old['year'].unique()} - set(years))
+
+    generation = manifest.get('next', 1)
+    segments = list(manifest.get('segments', []))
+    delta_cells = sum(segment['cells'] for segment in segments) + len(delta)
+    if 'base' not in manifest or len(delta) and (
+            len(segments) >= MAX_SEGMENTS or delta_cells > manifest['base_cells'] * MAX_DELTA_SHARE):
+        # The store now holds exactly the workbook's cells
+        name = f'base-{generation:06d}.arrow'
+        _write_segment(store_dir / name, new.assign(deleted=False))
+        manifest = {'base': name, 'base_cells': len(new), 'segments': []}
+        report['written'], report['compacted'] = name, True
+    elif len(delta):
+        name = f'delta-{generation:06d}.arrow'
+        _write_segment(store_dir / name, delta)
+        segments.append({
+            'name': name,
+            'cells': len(delta),
+            'ingested_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'changes': report['touched'],
+        })
+        manifest = dict(manifest, segments=segments)
+        report['written'] = name
+    # Same cells under a new digest (e.g. a re-sorted workbook) only
+    # records the digest, so the next start skips the diff
+
+    manifest.update({'source': source_name, 'digest': digest,
+                     'next': generation + 1 if report['written'] else generation})
+
+    write_bytes(store_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    # Drop files no longer referenced (folded segments, older layouts)
+    live = set(_segment_names(manifest))
+    for path in store_dir.glob('*.arrow'):
+        if path.name not in live:
+            path.unlink(missing_ok=True)
+    return report
+
+
+def load_long_store(store_dir=STORE_DIR):
+    """Return every cell of the store, ordered by year."""
+    with store_lock(store_dir):
+        return _read_store(pathlib.Path(store_dir))
+
+
+def _read_store(store_dir):
+    names = _segment_names(read_manifest(store_dir))
+    if not names:
+        return _empty_cells()
+    base = _read_segment(store_dir / names[0])
+    if len(names) == 1:
+        return base[COLUMNS]
+    # Later segments win; tombstones remove their cell
+    cells = pd.concat([base] + [_read_segment(store_dir / name) for name in names[1:]], ignore_index=True)
+    cells = cells.drop_duplicates(KEY, keep='last')
+    cells = cells[~cells['deleted']].sort_values('year', kind='stable')
+    return cells[COLUMNS].reset_index(drop=True)
+
+
+def main():
+    from world_population.data import WORKBOOK_PATH, load_merged_df
+
+    report = ingest_workbook(load_merged_df(), WORKBOOK_PATH.name)
+    print(f"{report['source']}: {len(report['years'])} year columns "
+          f"({', '.join(report['years'])})")
+    for year, counts in report['touched'].items():
+        print(f"  {year}: +{counts['added']} added, {counts['changed']} changed, "
+              f"-{counts['removed']} removed")
+    if report['skipped']:
+        print(f"  unchanged: {', '.join(report['skipped'])}")
+    if report['dropped']:
+        print(f"  dropped: {', '.join(report['dropped'])}")
+    if report['written']:
+        print(f"  wrote {report['written']}{' (compacted)' if report['compacted'] else ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Annual population series interpolated between the workbook's years.
+
+The workbook only has 1970, 1980, ... 2020, 2022, 2023, 2030 and 2050, so
+consecutive years can be up to 20 apart.  :func:`interpolate_annual` fills
+in every year in between for every country in one vectorized pass:
+populations are interpolated log-linearly (constant annual growth between
+two observations, the same rate as the growth table's CAGR), falling back to
+linear interpolation when an endpoint is zero.  Filled-in rows are flagged
+with ``interpolated=True``; observed rows keep their workbook values.
+"""
+import numpy as np
+import pandas as pd
+
+
+def interpolate_annual(df_reshaped):
+    """Return ``df_reshaped`` at annual resolution with an ``interpolated`` flag."""
+    countries = df_reshaped['country'].cat.codes.to_numpy()
+    observed_years = np.unique(df_reshaped['year'].to_numpy())
+    years = np.arange(observed_years[0], observed_years[-1] + 1, dtype='int16')
+
+    # values[country code, observed year]
+    n_countries = len(df_reshaped['country'].cat.categories)
+    values = np.full((n_countries, len(observed_years)), np.nan)
+    values[countries, np.searchsorted(observed_years, df_reshaped['year'].to_numpy())] = (
+        df_reshaped['population'].to_numpy(dtype='float64'))
+
+    # Bracketing observations and the position between them, per target year
+    upper = np.clip(np.searchsorted(observed_years, years), 1, len(observed_years) - 1)
+    lower = upper - 1
+    weight = ((years - observed_years[lower]) / (observed_years[upper] - observed_years[lower]))
+    start, end = values[:, lower], values[:, upper]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_linear = np.exp(np.log(start) * (1 - weight) + np.log(end) * weight)
+    linear = start * (1 - weight) + end * weight
+    annual = np.where((start > 0) & (end > 0), log_linear, linear)
+    interpolated = ~np.isin(years, observed_years)
+    # Keep observed cells bit-for-bit
+    annual[:, ~interpolated] = values[:, np.searchsorted(observed_years, years[~interpolated])]
+
+    # One row of labels per country, in category code order
+    first = df_reshaped.drop_duplicates('country')
+    first = first.iloc[np.argsort(first['country'].cat.codes.to_numpy(), kind='stable')]
+    codes = first['country'].cat.codes.to_numpy()
+    annual = annual[codes]
+
+    population = annual.reshape(-1)
+    if pd.api.types.is_integer_dtype(df_reshaped['population']) and not np.isnan(population).any():
+        population = population.round().astype('int64')
+    n_years = len(years)
+    return pd.DataFrame({
+        'country': first['country'].repeat(n_years).reset_index(drop=True),
+        'continent': first['continent'].repeat(n_years).reset_index(drop=True),
+        'year': np.tile(years, len(codes)),
+        'population': population,
+        'iso3': first['iso3'].repeat(n_years).reset_index(drop=True),
+        'interpolated': np.tile(interpolated, len(codes)),
+    })
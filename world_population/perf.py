@@ -0,0 +1,186 @@
+"""Named timing spans around the app's hot paths.
+
+Wrap a stage in :func:`span` and attach what it produced::
+
+    with perf.span('melt') as s:
+        df = merged_df.melt(...)
+        s.output = df
+
+Each finished span records its duration and the size of ``output`` (bytes
+and, for tabular results, rows).  Spans are collected per script run (the
+Streamlit script runs in one thread per session, so the current run lives
+in a thread-local) for the sidebar "Performance" panel.  A fragment rerun
+runs on a thread of its own without the top of the script, so it starts its
+own run, tagged with the fragment's name; :func:`recent_runs` keeps the last
+few runs of each session so the panel can list them.
+
+Spans can also be appended, with the session id, to a JSONL log for
+offline analysis.  The log is off by default: set ``WORLDPOP_PERF_LOG`` to
+``on`` for ``.cache/perf.jsonl`` or to another path.  Past
+:data:`MAX_LOG_BYTES` the log is moved to ``<path>.1`` (replacing the
+previous one) and a new one started, so it takes at most twice that.
+"""
+import collections
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+
+# Not imported from world_population.data, which itself records spans
+DEFAULT_LOG_PATH = pathlib.Path(__file__).resolve().parent.parent / '.cache' / 'perf.jsonl'
+MAX_LOG_BYTES = 16 * 1024 * 1024
+
+_local = threading.local()
+_log_lock = threading.Lock()
+# Last few runs per session, oldest session dropped first
+_recent = collections.OrderedDict()
+_recent_lock = threading.Lock()
+RECENT_RUNS = 8
+RECENT_SESSIONS = 1024
+
+
+def log_path():
+    value = os.environ.get('WORLDPOP_PERF_LOG', '')
+    if value.lower() in ('', '0', 'off', 'false', 'no'):
+        return None
+    if value.lower() in ('1', 'on', 'true', 'yes'):
+        return DEFAULT_LOG_PATH
+    return value
+
+
+def object_size(obj):
+    """Return ``(bytes, rows)`` for a span output; either may be ``None``."""
+    if obj is None:
+        return None, None
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'columns'):  # DataFrame
+        return int(obj.memory_usage(deep=False).sum()), len(obj)
+    if hasattr(obj, 'nbytes') and hasattr(obj, 'num_rows'):  # pyarrow.Table
+        return int(obj.nbytes), obj.num_rows
+    if isinstance(obj, str):
+        return len(obj.encode('utf-8')), None
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj), None
+    if hasattr(obj, 'data') and hasattr(obj, 'layout'):  # plotly Figure
+        rows = 0
+        for trace in obj.data:
+            locations = getattr(trace, 'locations', None)
+            rows += len(locations) if locations is not None else 0
+        return None, rows
+    if hasattr(obj, '__len__'):
+        return None, len(obj)
+    return None, None
+
+
+class Span:
+    def __init__(self, name):
+        self.name = name
+        self.output = None
+        self.started = time.time()
+        self.duration_ms = None
+        self.bytes = None
+        self.rows = None
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'started': self.started,
+            'duration_ms': self.duration_ms,
+            'bytes': self.bytes,
+            'rows': self.rows,
+        }
+
+
+class Run:
+    """The spans recorded during one script run of one session.
+
+    ``fragment`` names the fragment for a fragment-only rerun.
+    """
+
+    def __init__(self, session_id, fragment=None):
+        self.session_id = session_id
+        self.fragment = fragment
+        self.run_id = uuid.uuid4().hex[:12]
+        self.spans = []
+
+
+def start_run(session_id=None, fragment=None):
+    """Start collecting spans for a new script run in this thread."""
+    run = Run(session_id or 'no-session', fragment)
+    _local.run = run
+    with _recent_lock:
+        runs = _recent.pop(run.session_id, None) or collections.deque(maxlen=RECENT_RUNS)
+        runs.append(run)
+        _recent[run.session_id] = runs
+        while len(_recent) > RECENT_SESSIONS:
+            _recent.popitem(last=False)
+    return run
+
+
+def current_run():
+    return getattr(_local, 'run', None)
+
+
+def recent_runs(session_id):
+    """Return the last runs of ``session_id``, oldest first."""
+    with _recent_lock:
+        return list(_recent.get(session_id, ()))
+
+
+def _write_log(record):
+    path = log_path()
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(os.fspath(path)) or '.', exist_ok=True)
+        line = json.dumps(record, default=str) + '\n'
+        with _log_lock:
+            with open(path, 'a', encoding='utf-8') as fh:
+                fh.write(line)
+                full = fh.tell() >= MAX_LOG_BYTES
+            if full:
+                os.replace(path, f'{os.fspath(path)}.1')
+    except OSError:
+        # Timing must never break the page
+        pass
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time the ``with`` block as stage ``name``; see the module docstring."""
+    record = Span(name)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield record
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        record.duration_ms = (time.perf_counter() - start) * 1000
+        try:
+            record.bytes, record.rows = object_size(record.output)
+        except Exception:
+            pass
+        record.output = None
+
+        run = current_run()
+        if run is not None:
+            run.spans.append(record)
+        entry = record.as_dict()
+        entry['session_id'] = run.session_id if run else None
+        entry['run_id'] = run.run_id if run else None
+        entry['fragment'] = run.fragment if run else None
+        entry['error'] = error
+        _write_log(entry)
+
+
+def read_log(path=None):
+    """Return the logged span records (for offline analysis)."""
+    path = path or log_path()
+    if path is None or not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as fh:
+        return [json.loads(line) for line in fh if line.strip()]
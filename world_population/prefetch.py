@@ -0,0 +1,117 @@
+"""Speculative background prefetching of likely next selections.
+
+After a page renders, it hands the :data:`prefetcher` the work for the
+selections a user is likely to make next (for the Dashboard: the
+neighboring years and sibling continents).  The work runs on a small
+thread pool and fills the same caches the page reads, so when the user does
+step there the rerun is a cache hit.
+
+Each owner (a session) has at most one batch queued: scheduling a new batch
+cancels the owner's queued tasks, and tasks already dequeued skip their work
+when their batch is stale.  :meth:`Prefetcher.record_use` is called with the
+selection actually rendered, which counts whether prefetching paid off;
+:meth:`Prefetcher.stats` reports it.  ``WORLDPOP_PREFETCH=0`` disables it.
+"""
+import concurrent.futures
+import os
+import threading
+
+from world_population.cache import LRUCache
+
+PREFETCH_ENV = 'WORLDPOP_PREFETCH'
+
+
+class Prefetcher:
+    """Run ``(key, fn)`` tasks in the background, newest batch per owner only.
+
+    ``max_workers`` bounds the threads, ``max_in_flight`` the queued and
+    running tasks across all owners (extra tasks are dropped) and
+    ``tracked`` how many finished, not yet used keys are remembered for the
+    hit rate.
+    """
+
+    def __init__(self, max_workers=2, max_in_flight=16, tracked=1024, enabled=True):
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.enabled = enabled
+        self._executor = None
+        self._lock = threading.Lock()
+        # Latest batch number per owner; old sessions age out
+        self._generations = LRUCache(4096)
+        self._queued = {}
+        self._in_flight = set()
+        self._prefetched = LRUCache(tracked)
+        self._counts = dict.fromkeys(
+            ['scheduled', 'dropped', 'cancelled', 'stale', 'completed', 'failed', 'hits', 'misses'], 0)
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='prefetch')
+        return self._executor
+
+    def schedule(self, owner, tasks):
+        """Queue ``tasks`` for ``owner``, cancelling its previous batch."""
+        if not self.enabled:
+            return
+        with self._lock:
+            generation = self._generations.get(owner, 0) + 1
+            self._generations.put(owner, generation)
+            for future, key in self._queued.pop(owner, []):
+                if future.cancel():
+                    self._in_flight.discard(key)
+                    self._counts['cancelled'] += 1
+
+            queued = []
+            for key, fn in tasks:
+                if key in self._in_flight or key in self._prefetched:
+                    continue
+                if len(self._in_flight) >= self.max_in_flight:
+                    self._counts['dropped'] += 1
+                    continue
+                self._in_flight.add(key)
+                self._counts['scheduled'] += 1
+                queued.append((self._pool().submit(self._run, owner, generation, key, fn), key))
+            if queued:
+                self._queued[owner] = queued
+
+    def _run(self, owner, generation, key, fn):
+        try:
+            with self._lock:
+                stale = self._generations.get(owner) != generation
+                if stale:
+                    self._counts['stale'] += 1
+            if stale:
+                return
+            fn()
+        except Exception:
+            with self._lock:
+                self._counts['failed'] += 1
+        else:
+            with self._lock:
+                self._counts['completed'] += 1
+            self._prefetched.put(key, True)
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def record_use(self, key):
+        """Count whether the selection ``key`` being rendered was prefetched."""
+        if not self.enabled:
+            return
+        hit = self._prefetched.pop(key) is not None
+        with self._lock:
+            self._counts['hits' if hit else 'misses'] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            counts['in_flight'] = len(self._in_flight)
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_rate'] = counts['hits'] / lookups if lookups else 0.0
+        # Share of finished prefetches that a user went on to use
+        counts['useful_rate'] = counts['hits'] / counts['completed'] if counts['completed'] else 0.0
+        return counts
+
+
+prefetcher = Prefetcher(enabled=os.environ.get(PREFETCH_ENV, '1') != '0')
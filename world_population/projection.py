@@ -0,0 +1,105 @@
+"""Scenario projections from the ``worldpop.csv`` components.
+
+In ``worldpop.csv`` the Births, Deaths, Migration+ and Migration- of a year
+are the flows over the following five years, so for every region
+``Population[t + 5] = Population[t] + sum(components[t])`` holds exactly
+for the Medium variant (the Low and High variants leave a remainder of
+about 0.5%, which is carried along unscaled).  :class:`ProjectionEngine`
+holds the components of every region, variant (Low / Medium / High) and
+year in one array and projects all trajectories from the last 'Past' year
+at once: a multiplier per component (e.g. 1.1 for +10% migration) scales
+the flows and a cumulative sum rebuilds the populations.  With every
+multiplier at 1 the projection reproduces the 'Future' rows of the CSV.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from world_population.cache import LRUCache
+from world_population.data import WORLDPOP_PATH, file_signature, load_worldpop_df
+
+COMPONENTS = ['Births', 'Deaths', 'Migration+', 'Migration-']
+SCENARIOS = ['Low', 'Medium', 'High']
+
+
+class ProjectionEngine:
+    """Batched population projections for every region and scenario."""
+
+    def __init__(self, df):
+        years = np.sort(df['Year'].astype(int).unique())
+        self.regions = list(df['Region'].unique())
+        past_years = df.loc[df['Period'] == 'Past', 'Year'].astype(int)
+        self.base_year = int(past_years.max())
+
+        # values[category, region, scenario, year]
+        categories = ['Population'] + COMPONENTS
+        values = np.full((len(categories), len(self.regions), len(SCENARIOS), len(years)), np.nan)
+        df = df[df['Category'].isin(categories)]
+        values[pd.Index(categories).get_indexer(df['Category']),
+               pd.Index(self.regions).get_indexer(df['Region']),
+               :,
+               np.searchsorted(years, df['Year'].astype(int))] = df[SCENARIOS].to_numpy(dtype='float64')
+
+        start = int(np.searchsorted(years, self.base_year))
+        self.years = years[start:]
+        # Populations in the base year, (region, scenario)
+        self.base = values[0, :, :, start]
+        # Flows out of every projected year but the last, (component, region, scenario, step)
+        self.flows = values[1:, :, :, start:-1]
+        # What the components do not account for, (region, scenario, step)
+        self.residual = np.diff(values[0, :, :, start:], axis=-1) - self.flows.sum(axis=0)
+        self._results = LRUCache(maxsize=256)
+
+    def _key(self, multipliers):
+        multipliers = multipliers or {}
+        unknown = set(multipliers) - set(COMPONENTS)
+        if unknown:
+            raise ValueError(f'unknown components: {sorted(unknown)}')
+        return tuple(float(multipliers.get(component, 1.0)) for component in COMPONENTS)
+
+    def project(self, multipliers=None):
+        """Return populations as a read-only ``(region, scenario, year)`` array.
+
+        ``multipliers`` maps component names to scale factors; missing
+        components keep a factor of 1.  Results are memoized per parameter
+        set.
+        """
+        key = self._key(multipliers)
+
+        def compute():
+            flows = np.tensordot(np.asarray(key), self.flows, axes=1) + self.residual
+            populations = np.concatenate(
+                [self.base[..., None], self.base[..., None] + np.cumsum(flows, axis=-1)], axis=-1)
+            populations.setflags(write=False)
+            return populations
+        return self._results.get_or_create(key, compute)
+
+    def project_frame(self, multipliers=None, region=None):
+        """Return :meth:`project` as a long Year / Region / Scenario / Population frame."""
+        populations = self.project(multipliers)
+        regions = self.regions
+        if region is not None:
+            index = regions.index(region)
+            populations = populations[index:index + 1]
+            regions = [region]
+        n_regions, n_scenarios, n_years = populations.shape
+        return pd.DataFrame({
+            'Year': np.tile(self.years, n_regions * n_scenarios),
+            'Region': np.repeat(regions, n_scenarios * n_years),
+            'Scenario': np.tile(np.repeat(SCENARIOS, n_years), n_regions),
+            'Population': populations.reshape(-1),
+        })
+
+    def stats(self):
+        return self._results.stats()
+
+
+@functools.lru_cache(maxsize=4)
+def _load_engine(path, signature):
+    return ProjectionEngine(load_worldpop_df(path))
+
+
+def load_projection_engine(path=WORLDPOP_PATH):
+    """Return the memoized :class:`ProjectionEngine` for ``worldpop.csv``."""
+    return _load_engine(str(path), file_signature(path))
@@ -0,0 +1,98 @@
+"""Process-wide registry of the app's datasets.
+
+Every Streamlit session runs in the same process, so each dataset is loaded
+once here and sessions receive shallow, read-only views of it: the views
+share the loaded column buffers, and pandas' copy-on-write turns any
+mutation of a view into a private copy, so one session can never change
+another session's data.  The registry tracks the deep memory of each loaded
+dataset and how many views of it are alive.
+"""
+import threading
+import weakref
+
+import pandas as pd
+
+# Copy-on-write is the only mode in pandas 3 (where the option is
+# deprecated); older versions need it for views handed to sessions to be
+# safe to mutate.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+
+class _Entry:
+    def __init__(self, loader, signature):
+        self.loader = loader
+        self.signature = signature
+        self.frame = None
+        self.version = None
+        self.bytes = 0
+        self.loads = 0
+        self.views_created = 0
+        self.live_views = 0
+
+
+class DatasetRegistry:
+    """Load each registered dataset once and hand out read-only views."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, loader, signature=lambda: None):
+        """Register ``loader()`` under ``name``.
+
+        ``signature()`` is called on every :meth:`get`; when its value
+        changes (e.g. the source file's mtime) the dataset is reloaded.
+        Views handed out before the reload keep the old data.
+        """
+        with self._lock:
+            self._entries[name] = _Entry(loader, signature)
+
+    def ensure(self, name, loader, signature=lambda: None):
+        """Register ``name`` unless it already is."""
+        with self._lock:
+            if name not in self._entries:
+                self.register(name, loader, signature)
+
+    def names(self):
+        return list(self._entries)
+
+    def _load(self, name):
+        entry = self._entries[name]
+        version = entry.signature()
+        if entry.frame is None or version != entry.version:
+            frame = entry.loader()
+            entry.frame = frame
+            entry.version = version
+            entry.bytes = int(frame.memory_usage(deep=True).sum())
+            entry.loads += 1
+        return entry
+
+    def get(self, name):
+        """Return a read-only view of dataset ``name``."""
+        with self._lock:
+            entry = self._load(name)
+            view = entry.frame.copy(deep=False)
+            entry.views_created += 1
+            entry.live_views += 1
+        weakref.finalize(view, self._release, entry)
+        return view
+
+    def _release(self, entry):
+        with self._lock:
+            entry.live_views -= 1
+
+    def stats(self):
+        """Return ``{name: {...}}`` with memory and reference counts."""
+        with self._lock:
+            return {
+                name: {
+                    'loaded': entry.frame is not None,
+                    'bytes': entry.bytes,
+                    'rows': len(entry.frame) if entry.frame is not None else 0,
+                    'loads': entry.loads,
+                    'views_created': entry.views_created,
+                    'live_views': entry.live_views,
+                }
+                for name, entry in self._entries.items()
+            }
@@ -0,0 +1,351 @@
+"""Result cache shared between app replicas.
+
+The in-process :class:`~world_population.cache.LRUCache` instances stay in
+front as the first level; behind them, expensive results (choropleths,
+story HTML, filtered tables) go to a shared backend so a result computed by
+one replica (or by ``python -m world_population.warmup``) is reused by all.
+
+The backend is chosen with ``WORLDPOP_CACHE_BACKEND``:
+
+``memory`` (default)
+    this process only, so the backend is opt-in.
+``disk``
+    files under ``.cache/shared/``; shared by processes on one machine.
+``disk:/path``
+    the same in another directory, e.g. a volume mounted by every replica.
+``redis://host:6379/0``
+    a Redis server (needs the ``redis`` package); shared by every replica.
+``fakeredis``
+    :class:`FakeRedis`, an in-process stand-in for Redis used in tests.
+
+Values are serialized without pickle: Plotly figures as their JSON,
+DataFrames as Arrow IPC streams, text and bytes as is.  Every entry has its
+own TTL, and every key carries the namespace's ``version``: bump it when
+the code building the namespace's values changes, so stale results left in
+a shared backend are not served.  A failing backend (e.g. Redis unreachable) is counted in
+:meth:`SharedCache.stats` and treated as a miss, never as an error.
+"""
+import fnmatch
+import hashlib
+import io
+import os
+import threading
+import time
+
+from world_population.atomic import write_bytes
+from world_population.cache import LRUCache
+from world_population.data import CACHE_DIR
+
+BACKEND_ENV = 'WORLDPOP_CACHE_BACKEND'
+SHARED_CACHE_DIR = CACHE_DIR / 'shared'
+
+_MISSING = object()
+
+
+# Serialization
+
+def dumps(value):
+    """Return ``value`` as tagged bytes."""
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    if value is None:
+        return b'N'
+    if isinstance(value, bytes):
+        return b'B' + value
+    if isinstance(value, str):
+        return b'S' + value.encode('utf-8')
+    if isinstance(value, go.Figure):
+        return b'F' + value.to_json().encode('utf-8')
+    if isinstance(value, pd.DataFrame):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(value)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return b'D' + sink.getvalue()
+    raise TypeError(f'cannot serialize {type(value).__name__} for the shared cache')
+
+
+def loads(payload):
+    """Return the value serialized by :func:`dumps`."""
+    tag, body = payload[:1], payload[1:]
+    if tag == b'N':
+        return None
+    if tag == b'B':
+        return bytes(body)
+    if tag == b'S':
+        return bytes(body).decode('utf-8')
+    if tag == b'F':
+        import plotly.io as pio
+
+        return pio.from_json(bytes(body).decode('utf-8'))
+    if tag == b'D':
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(pa.py_buffer(body)).read_all().to_pandas()
+    raise ValueError(f'unknown shared cache payload tag {tag!r}')
+
+
+# Backends: get(key) -> bytes or None, set(key, payload, ttl), delete(key),
+# clear(), prune()
+
+class MemoryBackend:
+    """Payloads in this process only."""
+
+    def __init__(self, maxsize=1024):
+        self._entries = LRUCache(maxsize)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, payload, ttl=None):
+        self._entries.put(key, payload, ttl)
+
+    def delete(self, key):
+        self._entries.pop(key)
+
+    def clear(self):
+        self._entries.clear()
+
+    def prune(self):
+        return 0
+
+
+class DiskBackend:
+    """One file per entry; the first line holds the expiry time."""
+
+    def __init__(self, directory=SHARED_CACHE_DIR, clock=time.time):
+        self.directory = directory
+        self._clock = clock
+
+    def _path(self, key):
+        return self.directory / f'{hashlib.sha1(key.encode("utf-8")).hexdigest()}.bin'
+
+    def _read(self, path):
+        with open(path, 'rb') as fh:
+            header, payload = fh.read().split(b'\n', 1)
+        return (None if header == b'-' else float(header)), payload
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            expires, payload = self._read(path)
+        except FileNotFoundError:
+            return None
+        if expires is not None and expires <= self._clock():
+            path.unlink(missing_ok=True)
+            return None
+        return payload
+
+    def set(self, key, payload, ttl=None):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        header = b'-' if ttl is None else repr(self._clock() + ttl).encode()
+        write_bytes(path, header + b'\n' + payload)
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self):
+        for path in self.directory.glob('*.bin'):
+            path.unlink(missing_ok=True)
+
+    def prune(self):
+        """Delete expired entries; return how many."""
+        removed = 0
+        now = self._clock()
+        for path in self.directory.glob('*.bin'):
+            try:
+                expires, _ = self._read(path)
+            except (FileNotFoundError, ValueError):
+                continue
+            if expires is not None and expires <= now:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class RedisBackend:
+    """Entries in Redis under ``prefix``; Redis expires them itself."""
+
+    def __init__(self, client, prefix='worldpop:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, prefix='worldpop:'):
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=2), prefix)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, payload, ttl=None):
+        # Redis expiries are whole seconds (or milliseconds with px)
+        self.client.set(self.prefix + key, payload, px=None if ttl is None else max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def prune(self):
+        return 0
+
+
+class FakeRedis:
+    """The part of the ``redis.Redis`` API that :class:`RedisBackend` uses."""
+
+    def __init__(self, clock=time.monotonic):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def _live(self, name):
+        entry = self._data.get(name)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            del self._data[name]
+            return None
+        return entry
+
+    def get(self, name):
+        with self._lock:
+            entry = self._live(name)
+            return None if entry is None else entry[0]
+
+    def set(self, name, value, ex=None, px=None):
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        with self._lock:
+            self._data[name] = (bytes(value), None if ttl is None else self._clock() + ttl)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def scan_iter(self, match='*'):
+        with self._lock:
+            names = [name for name in self._data if self._live(name) is not None]
+        return iter(fnmatch.filter(names, match))
+
+    def ping(self):
+        return True
+
+
+def make_backend(spec=None):
+    """Return the backend described by ``spec`` (default: the environment)."""
+    spec = spec if spec is not None else os.environ.get(BACKEND_ENV, 'memory')
+    if spec == 'memory':
+        return MemoryBackend()
+    if spec == 'disk':
+        return DiskBackend()
+    if spec.startswith('disk:'):
+        import pathlib
+
+        return DiskBackend(pathlib.Path(spec[len('disk:'):]))
+    if spec.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend.from_url(spec)
+    if spec == 'fakeredis':
+        return RedisBackend(FakeRedis())
+    raise ValueError(f'unknown {BACKEND_ENV} {spec!r}')
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def default_backend():
+    """Return the process-wide backend, created on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = make_backend()
+        return _backend
+
+
+def set_default_backend(backend):
+    """Replace the process-wide backend (e.g. with a ``FakeRedis`` one)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _backend_errors():
+    errors = (OSError, ValueError)
+    try:
+        import redis
+    except ImportError:
+        return errors
+    return errors + (redis.RedisError,)
+
+
+class SharedCache:
+    """A namespace of results in a shared backend.
+
+    ``key`` is any tuple with a stable ``repr`` (strings, numbers, nested
+    tuples); it must not contain anything machine specific such as a file's
+    mtime, or replicas will not find each other's entries.  ``version`` is
+    part of every key; bump it when the values' builder or format changes.
+    """
+
+    def __init__(self, namespace, ttl=None, backend=None, version=1):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.version = version
+        self._backend = backend
+        self._errors = _backend_errors()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def backend(self):
+        return self._backend if self._backend is not None else default_backend()
+
+    def _key(self, key):
+        return f'{self.namespace}:v{self.version}:{hashlib.sha1(repr(key).encode("utf-8")).hexdigest()}'
+
+    def get(self, key, default=None):
+        try:
+            payload = self.backend.get(self._key(key))
+            value = _MISSING if payload is None else loads(payload)
+        except self._errors:
+            self.errors += 1
+            value = _MISSING
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value, ttl=_MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        try:
+            self.backend.set(self._key(key), dumps(value), ttl)
+        except self._errors:
+            self.errors += 1
+
+    def get_or_create(self, key, factory, ttl=_MISSING):
+        """Return the shared value for ``key``, building and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value, ttl)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
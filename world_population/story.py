@@ -0,0 +1,387 @@
+"""Prebuilt "Story Tellings" HTML, one story per region.
+
+Building the 13-slide ``Story`` and rendering it with ``_repr_html_`` is the
+expensive part of the page, so the HTML for each region is built once and
+kept both in memory and in the shared cache backend (see
+:mod:`world_population.shared_cache`), so other processes and replicas
+reuse it.  Entries are keyed on the ``worldpop.csv`` contents, so editing
+the CSV invalidates them.
+"""
+from ipyvizzu import Data, Config, Style
+from ipyvizzustory import Story, Slide, Step
+
+from world_population import perf
+from world_population.cache import LRUCache
+from world_population.data import WORLDPOP_PATH, file_signature, file_version, load_worldpop_df
+from world_population.shared_cache import SharedCache
+
+# Size of the story on the Story Tellings page
+STORY_WIDTH = 1280
+STORY_HEIGHT = 600
+
+story_html_cache = LRUCache(maxsize=64)
+# Bump when build_story or the HTML it writes change
+STORY_CACHE_VERSION = 1
+shared_stories = SharedCache('story', ttl=7 * 24 * 60 * 60, version=STORY_CACHE_VERSION)
+
+
+def story_rows(df, sel_region):
+    """Return the rows of ``df`` that the story for ``sel_region`` filters on.
+
+    The opening slides compare the population of every region; from slide 6
+    on only ``sel_region`` is shown, including its birth, death and
+    migration components.  Every column is used by some slide.
+    """
+    keep = (df['Category'] == 'Population') | (df['Region'] == sel_region)
+    return df[keep]
+
+
+def build_story(df, sel_region, width, height):
+    """Return the ``Story`` for ``sel_region``."""
+    regions = df['Region'].unique()
+
+    df_region = df[df['Region'] == sel_region]
+
+    pop_max = int(df_region[df_region['Category'] == 'Population'][['Medium','High','Low']].max().T.max()*1.1)
+
+    df_future = df_region[df_region['Period'] == 'Future']
+
+    df_futureCategories = df_future[df_future['Category']!='Population'][['Category','Medium','High','Low']];
+
+    df_future_sum = df_futureCategories.groupby('Category').sum().T
+
+    other_max = df_future_sum.max().max() * 1.1
+    other_min = df_future_sum.max().max() * -1.1 
+
+    region_palette = ['#FE7B00FF','#FEBF25FF','#55A4F3FF','#91BF3BFF','#E73849FF','#948DEDFF']
+    region_palette_str = ' '.join(region_palette)
+
+    region_color = region_palette[list(regions).index(sel_region)]
+
+    category_palette = ['#FF8080FF', '#808080FF', region_color.replace('FF','20'), '#60A0FFFF', '#80A080FF']
+    category_palette_str = ' '.join(category_palette)
+
+    # Define the style of the charts in the story
+    style = {
+            'legend' : {'width' : '13em'},
+            'plot': {
+                'yAxis': {
+                    'label': {
+                        'fontSize': '1em',
+                        'numberFormat' : 'prefixed',
+                        'numberScale':'shortScaleSymbolUS'
+                    },
+                    'title': {'color': '#ffffff00'},
+                },
+                'marker' :{ 
+                    'label' :{ 
+                        'numberFormat' : 'prefixed',
+                        'maxFractionDigits' : '1',
+                        'numberScale':'shortScaleSymbolUS',
+                    }
+                },
+                'xAxis': {
+                    'label': {
+                        'angle': '2.5',
+                        'fontSize': '1em',
+                        'paddingRight': '0em',
+                        'paddingTop': '1em',
+                        'numberFormat' : 'grouped',
+                    },
+                    'title': {'color': '#ffffff00'},
+                },
+            },
+        }
+
+    # Only ship the rows this region's slides can show
+    data = Data()
+    data.add_data_frame(story_rows(df, sel_region))
+
+    story = Story(data=data)
+    story.set_size(width, height)
+
+    # Add the first slide, containing a single animation step 
+    # that sets the initial chart.
+
+    slide1 = Slide(
+            Step(
+                Data.filter("record.Period === 'Past' && record.Category === 'Population'"),
+                Config(
+                    {
+                        'x':'Year',
+                        'y': 'Medium',
+                        'label': 'Medium',
+                        'title': 'The Population of the World 1950-2020',
+                    }
+                ),
+                Style(style)
+            )
+        )
+        # Add the slide to the story
+    story.add_slide(slide1)
+
+        # Show components side-by-side
+    slide2 = Slide(
+            Step(
+                Config(
+                    {
+                        'y': ['Medium','Region'],
+                        'color': 'Region',
+                        'label': None,
+                        'title': 'The Population of Regions 1950-2020',
+                    }
+                ),
+                Style({ 'plot.marker.colorPalette': region_palette_str })
+            )
+        )
+    story.add_slide(slide2)
+
+        # Show components side-by-side
+    slide3 = Slide()
+    slide3.add_step(    
+            Step(
+                Data.filter("record.Category === 'Population'"),
+                Config(
+                    {
+                        'y': ['Medium','Region'],
+                        'color': 'Region',
+                #     'lightness': 'Period',
+                #     'x': ['Year','Period'],
+                        'title': 'The Population of Regions 1950-2060',
+                    }
+                )
+        ))
+
+    slide3.add_step(    
+            Step(
+                Config(
+                    {
+                    'geometry':'area'
+                    }
+                )
+        ))
+
+    story.add_slide(slide3)
+
+    slide4 = Slide(
+            Step(
+                Config(
+                    {
+                        'split': True
+                    },
+                ),
+                Style({'plot' : {'yAxis' :{ 'label' :{ 'color' : '#99999900'}}}})
+            )
+        )
+    story.add_slide(slide4)
+
+    slide5 = Slide(
+            Step(
+                Config.percentageArea(
+                    {
+                        'x':'Year',
+                        'y':'Medium',
+                        'stackedBy':'Region',
+                        'title': 'The Population of Regions 1950-2060 (%)'
+                    }
+                ),
+                Style({'plot' : {'yAxis' :{ 'label' :{ 'color' : '#999999FF'}}}})
+            )
+        )
+    story.add_slide(slide5)
+
+
+    slide6 = Slide()
+    slide6.add_step(    
+        Step(
+            Config.stackedArea(
+                {
+                    'x':'Year',
+                    'y':'Medium',
+                    'stackedBy':'Region',
+                }
+            ),
+        Style(style) #,{'plot.marker.colorPalette': region_palette_str}
+    ))
+
+    slide6.add_step(    
+        Step(
+            Data.filter(f'record.Category === "Population" && record.Region === "{sel_region}"'),
+            Config({
+                    'title': 'The Population of '+sel_region+' 1950-2060',
+                    'channels':{'y':{
+                        'range':{'max':pop_max}
+                    }}
+            }),
+        ))
+
+    story.add_slide(slide6)
+
+    slide7 = Slide(
+        Step(
+            Config(
+                {
+                    'y':'High',
+                    'title': 'High prediction for '+sel_region
+                }
+            )
+        )
+    )
+    story.add_slide(slide7)
+
+    slide8 = Slide(
+        Step(
+            Config(
+                {
+                    'y':'Low',
+                    'title': 'Low prediction for '+sel_region
+                }
+            )
+        )
+    )
+    story.add_slide(slide8)
+
+    slide9 = Slide(
+        Step(
+            Config(
+                {
+                    'y':'Medium',
+                    'title': 'Medium prediction for '+sel_region
+                }
+            )
+        )
+    )
+    story.add_slide(slide9)
+
+    slide10 = Slide()
+
+    slide10.add_step(
+        Step(
+            Config({
+                'y':['Medium','Category'],
+                'title': 'Adding Sources of Gain and Loss to the Mix '
+            }),
+        )
+    )
+
+    slide10.add_step(
+        Step(
+            Data.filter(f'record.Region === "{sel_region}" && (record.Category === "Population" || record.Category === "Migration+" || record.Category === "Births")'),
+            Config(
+                {
+                    'color': ['Category']
+                }),
+            Style({ 'plot.marker.colorPalette': category_palette_str })
+        )
+    )
+
+    slide10.add_step(
+        Step(
+            Data.filter(f'record.Region === "{sel_region}"'),
+        )
+    )
+    story.add_slide(slide10)
+
+    slide11 = Slide()
+
+    slide11.add_step(
+        Step(
+            Config(
+                {
+                    'geometry':'rectangle',
+                }
+            )
+        )
+    )
+
+    slide11.add_step(
+        Step(
+            Data.filter(f'record.Period === "Future" && record.Region === "{sel_region}"'),
+            Config(
+                {
+                    'title': 'Zoom to the future'
+                }
+            )
+        )
+    )
+
+    slide11.add_step(
+        Step(
+            Data.filter(f'record.Period === "Future" && record.Region === "{sel_region}" && record.Category !== "Population"'),
+            Config(
+                {
+                    'channels':{
+                        'x':{'set':['Medium','Year'],'range':{'max':other_max,'min':other_min}},
+                        'y':{'set': 'Category', 'range':{'max':'auto'}},
+                    },
+                    'title': 'Sources of Population Gain and Loss - Medium Scenario'
+                },
+            ),
+            Style({'plot' : {'marker' :{ 'label' :{ 'maxFractionDigits' : '1'}}}})
+
+        )
+    )
+
+    slide11.add_step(
+        Step(
+            Config(
+                {
+                    'x':'Medium',
+                    'label':'Medium',
+                }
+            )
+        )
+    )
+
+
+    story.add_slide(slide11)
+
+    slide12 = Slide(
+        Step(
+            Config(
+                {
+                    'x':'High',
+                    'label': 'High',
+                    'title': 'Sources of Population Gain and Loss - High Scenario'
+                }
+            )
+        )
+    )
+    story.add_slide(slide12)
+
+    slide13 = Slide(
+        Step(
+            Config(
+                {
+                    'x':'Low',
+                    'label': 'Low',
+                    'title': 'Sources of Population Gain and Loss - Low Scenario'
+                }
+            )
+        )
+    )
+    story.add_slide(slide13)
+
+    # Switch on the tooltip that appears when the user hovers the mouse over a chart element.
+    story.set_feature('tooltip', True)
+
+    return story
+
+
+def _render(sel_region, width, height):
+    with perf.span('story_build'):
+        story = build_story(load_worldpop_df(), sel_region, width, height)
+    with perf.span('story_repr_html') as span:
+        story_html = story._repr_html_()
+        span.output = story_html
+    return story_html
+
+
+def story_html(sel_region, width, height, path=WORLDPOP_PATH):
+    """Return the rendered story HTML for ``sel_region``."""
+    signature = file_signature(path)
+    key = (signature, sel_region, width, height)
+    return story_html_cache.get_or_create(
+        key, lambda: shared_stories.get_or_create(
+            (file_version(path), sel_region, width, height),
+            lambda: _render(sel_region, width, height)))
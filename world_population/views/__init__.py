@@ -0,0 +1,6 @@
+"""One module per ``option_menu`` page.
+
+``Python_2.py`` imports a page module only when that page is selected, so
+each page's heavy dependencies (plotly, ipyvizzu, ...) are paid for on
+first use rather than at cold start.  Every module exposes ``render()``.
+"""
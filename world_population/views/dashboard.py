@@ -0,0 +1,343 @@
+"""Dashboard page: KPIs, choropleth and ranking table for a selection."""
+import streamlit as st
+from streamlit_extras.colored_header import colored_header
+
+from world_population import perf
+from world_population.cache import LRUCache
+from world_population.compare import METRICS, build_comparison_figure, cached_compare
+from world_population.data import (WORKBOOK_PATH, file_signature, file_version, load_annual_df, load_merged_df,
+                                   load_reshaped_df, select_rows, used_categories)
+from world_population.density import build_density_deck, density_frame, unmapped_countries
+from world_population.growth import load_growth_table
+from world_population.prefetch import prefetcher
+from world_population.figures import COLOR_THEMES, cached_animated_choropleth, cached_choropleth
+from world_population.shared_cache import SharedCache
+from world_population.views import performance
+
+
+def make_choropleth(input_df, selected_year, selected_continent, selected_country, input_color_theme, annual=False):
+    # Finished figures are kept in a process-wide LRU cache, so returning to a
+    # selection (or a selection made in another session) skips the rebuild
+    with perf.span('make_choropleth') as span:
+        choropleth = cached_choropleth(input_df, selected_year, selected_continent, selected_country,
+                                       input_color_theme, annual)
+        span.output = choropleth
+    if choropleth is None:
+        # Return None or an appropriate message if there is no data to plot
+        st.error('No data available to plot for the selected options.')
+    return choropleth
+
+
+def make_animated_choropleth(input_df, selected_continent, selected_country, input_color_theme, annual=False):
+    with perf.span('make_animated_choropleth') as span:
+        choropleth = cached_animated_choropleth(input_df, selected_continent, selected_country,
+                                                input_color_theme, annual)
+        span.output = choropleth
+    if choropleth is None:
+        st.error('No data available to plot for the selected options.')
+    return choropleth
+
+
+def make_density_map(input_df, selected_year, selected_continent, selected_country, input_color_theme):
+    # The shapes are loaded and simplified once per process; a rerun only
+    # joins the selected year's densities and colors onto them
+    with perf.span('make_density_map') as span:
+        frame = density_frame(input_df, load_merged_df(), selected_year, selected_continent,
+                              selected_country, input_color_theme)
+        span.output = frame
+        deck = build_density_deck(frame, selected_continent)
+    # Small countries (mostly islands) have no shape at the 1:110m scale
+    unmapped = unmapped_countries(select_rows(input_df, selected_year, selected_continent, selected_country))
+    if deck is None:
+        if unmapped:
+            st.info(f"{', '.join(unmapped)} is too small for the country shapes of the density map.")
+        else:
+            st.error('No data available to plot for the selected options.')
+    elif unmapped:
+        st.caption(f"No shape at this scale, not drawn: {', '.join(unmapped)}")
+    return deck
+
+
+def format_population(population):
+    # Convert population to millions and round to one decimal place
+    population_in_millions = round(population / 1_000_000, 1)
+    # Return formatted string
+    return f"{population_in_millions}M"
+
+
+# Sorted ranking tables keyed on (workbook signature, year, continent, country, annual)
+ranking_cache = LRUCache(maxsize=256, ttl=60 * 60)
+# ... and behind it in the shared cache backend, for the other replicas
+# (bump the version when the ranking columns change)
+shared_rankings = SharedCache('ranking', ttl=60 * 60, version=1)
+
+
+def metrics_panel(growth_table, selected_year, selected_continent, selected_country, interpolated=False):
+    # Main
+    # Look up the selection in the growth table computed once at load time
+    with perf.span('kpi_lookup'):
+        growth = growth_table.lookup(selected_year, selected_continent, selected_country) or {}
+
+    current_year_population = growth.get('population', 0)
+    previous_year = growth.get('previous_year')
+    previous_year = int(previous_year) if previous_year is not None else None
+    previous_year_population = growth['previous_population'] if previous_year is not None else 0
+
+    # Calculate the difference
+    population_difference = current_year_population - previous_year_population
+
+    # Calculate the percentage change
+    if previous_year_population > 0:
+        percentage_change = growth['pct_change']
+    else:
+        percentage_change = 0
+
+    # Format the numbers
+    current_year_population_formatted = format_population(current_year_population)
+    population_difference_formatted = format_population(population_difference)
+
+    st.subheader(f"Change from {previous_year} to {selected_year}")
+    if interpolated:
+        st.caption(f"{selected_year} is not in the workbook; its values are interpolated.")
+
+    # Display the metric
+    st.metric(label="In People", value=current_year_population_formatted, delta=population_difference_formatted)
+    st.metric(label="In Percentage", value=f"{percentage_change:.2f}%", delta="")
+    if previous_year_population > 0:
+        # The years in the data are 2 to 20 apart, so also show the annual rate
+        st.metric(label="Per Year (CAGR)", value=f"{growth['cagr']:.2f}%", delta="")
+    if selected_country != 'All' and growth:
+        rank_change = growth['rank_change']
+        st.metric(label="World Rank", value=f"#{int(growth['rank'])}",
+                  delta=f"{int(rank_change):+d}" if rank_change == rank_change and rank_change else None)
+
+
+def movers_panel(growth_table, selected_year, selected_continent):
+    fastest_growing, fastest_shrinking = growth_table.movers(selected_year, selected_continent)
+    if fastest_growing.empty:
+        st.caption(f"No earlier year to compare {selected_year} with.")
+        return
+    column_config = {
+        "country": st.column_config.TextColumn("Country"),
+        "previous_year": st.column_config.NumberColumn("Since", format="%d"),
+        "pct_change": st.column_config.NumberColumn("Change", format="%.2f%%"),
+        "cagr": st.column_config.NumberColumn("Per Year", format="%.2f%%"),
+        "abs_change": st.column_config.NumberColumn("In People", format="%d"),
+    }
+    left_column, right_column = st.columns(2)
+    with left_column:
+        st.markdown("**Fastest growing**")
+        st.dataframe(fastest_growing, hide_index=True, column_config=column_config)
+    with right_column:
+        st.markdown("**Fastest shrinking**")
+        st.dataframe(fastest_shrinking, hide_index=True, column_config=column_config)
+
+
+@performance.fragment
+def map_panel(df_reshaped, selected_year, selected_continent, selected_country, annual=False):
+    # Code for Plot section
+    st.subheader('World Population Map')
+
+    # The theme lives inside the fragment, so changing it only restyles the map
+    selected_color_theme = st.selectbox('Select a color theme', COLOR_THEMES, key='color_theme')
+    # "Play years" sends every year as animation frames in one figure, so
+    # scrubbing and playback run in the browser without server reruns
+    # Density is drawn with pydeck from cached, pre-simplified country shapes
+    density_map = st.toggle('Density (people per km²)', key='density_map')
+    play_years = st.toggle('Play years', key='play_years', disabled=density_map)
+
+    # Create a container for the map
+    with st.container():
+        if density_map:
+            deck = make_density_map(df_reshaped, selected_year, selected_continent, selected_country,
+                                    selected_color_theme)
+            if deck is not None:
+                st.pydeck_chart(deck)
+            return
+        if play_years:
+            choropleth = make_animated_choropleth(df_reshaped, selected_continent, selected_country, selected_color_theme,
+                                                  annual)
+        else:
+            # Call the make_choropleth function with the selected options
+            choropleth = make_choropleth(df_reshaped, selected_year, selected_continent, selected_country, selected_color_theme,
+                                         annual)
+
+        # Display the interactive choropleth map in the app
+        if choropleth is not None:
+            st.plotly_chart(choropleth)
+
+
+def ranking_table(df_reshaped, selected_year, selected_continent, selected_country, annual=False):
+    """Return the selection sorted by population, largest first."""
+    def build():
+        with perf.span('ranking_table') as span:
+            # Filter the data based on the selected year, continent, and country
+            df_selected_country = select_rows(df_reshaped, selected_year, selected_continent, selected_country)
+
+            # Sort the filtered data by population in descending order
+            df_selected_country = df_selected_country.sort_values(by="population", ascending=False)
+            span.output = df_selected_country
+        return df_selected_country[['country', 'year', 'population']]
+
+    key = (file_signature(WORKBOOK_PATH), selected_year, selected_continent, selected_country, annual)
+    shared_key = (file_version(WORKBOOK_PATH),) + key[1:]
+    return ranking_cache.get_or_create(key, lambda: shared_rankings.get_or_create(shared_key, build))
+
+
+def ranking_panel(df_reshaped, selected_year, selected_continent, selected_country, annual=False):
+    df_selected_country = ranking_table(df_reshaped, selected_year, selected_continent, selected_country, annual)
+
+    # Display the DataFrame as a table
+    st.dataframe(df_selected_country,
+                column_order=("country", "population"),
+                hide_index=True,
+                column_config={
+                    "country": st.column_config.TextColumn(
+                        "Country",
+                    ),
+                    "population": st.column_config.ProgressColumn(
+                        "Population",
+                        format="%f",
+                        min_value=0,
+                        max_value=max(df_selected_country.population, default=0),
+                    )
+                }
+    )
+
+
+@performance.fragment
+def comparison_panel(df_reshaped, year_list, country_list, selected_country, annual=False):
+    # Every series and delta comes from one query over df_reshaped, so
+    # comparing n countries costs one rerun, not n
+    default_countries = [selected_country] if selected_country != 'All' else country_list[1:6]
+    countries = st.multiselect('Countries', used_categories(df_reshaped.country), default=default_countries,
+                               key='compare_countries')
+    year_options = sorted(year_list)
+    # The annual series would default to ~150 years; start from the decades
+    default_years = [year for year in year_options if year % 10 == 0] if annual else year_options
+    years = st.multiselect('Years', year_options, default=default_years, key=f'compare_years_{int(annual)}')
+    metric = st.radio('Show', list(METRICS), format_func=METRICS.get, horizontal=True, key='compare_metric')
+    if not countries or not years:
+        st.info('Pick at least one country and one year to compare.')
+        return
+
+    with perf.span('compare') as span:
+        comparison = cached_compare(df_reshaped, countries, years, annual)
+        span.output = comparison
+    st.plotly_chart(build_comparison_figure(comparison, metric))
+    st.dataframe(comparison,
+                 column_order=('country', 'year', 'population', 'abs_change', 'pct_change', 'cagr', 'index'),
+                 hide_index=True,
+                 column_config={
+                     'country': st.column_config.TextColumn('Country'),
+                     'year': st.column_config.NumberColumn('Year', format='%d'),
+                     'population': st.column_config.NumberColumn('Population', format='%d'),
+                     'abs_change': st.column_config.NumberColumn('Change', format='%+d'),
+                     'pct_change': st.column_config.NumberColumn('Change (%)', format='%+.2f'),
+                     'cagr': st.column_config.NumberColumn('Per year (%)', format='%+.2f'),
+                     'index': st.column_config.NumberColumn('Index', format='%.1f'),
+                 })
+
+
+def likely_next(year_list, continent_list, selected_year, selected_continent, selected_country):
+    """Return the selections a user most likely steps to next, best first."""
+    candidates = []
+    index = year_list.index(selected_year)
+    for neighbor in (index + 1, index - 1):
+        if 0 <= neighbor < len(year_list):
+            candidates.append((year_list[neighbor], selected_continent, selected_country))
+    if selected_country == 'All':
+        index = continent_list.index(selected_continent)
+        siblings = [continent_list[i] for i in (index + 1, index - 1) if 0 <= i < len(continent_list)]
+        for continent in siblings + ['All']:
+            if continent != selected_continent:
+                candidates.append((selected_year, continent, 'All'))
+    return list(dict.fromkeys(candidates))
+
+
+def prefetch_neighbors(df_reshaped, growth_table, year_list, continent_list, selected_year,
+                       selected_continent, selected_country, color_theme, annual):
+    # Build the figure, KPIs and table of the likely next selections in the
+    # background, into the same caches the panels read
+    run = perf.current_run()
+    owner = run.session_id if run else None
+    selection = (selected_year, selected_continent, selected_country, color_theme, annual)
+    # Only count reruns that changed the selection
+    if st.session_state.get('_dashboard_selection') != selection:
+        st.session_state['_dashboard_selection'] = selection
+        prefetcher.record_use(selection)
+
+    def task(year, continent, country):
+        def prefetch():
+            cached_choropleth(df_reshaped, year, continent, country, color_theme, annual)
+            growth_table.lookup(year, continent, country)
+            ranking_table(df_reshaped, year, continent, country, annual)
+        return (year, continent, country, color_theme, annual), prefetch
+
+    prefetcher.schedule(owner, [task(*selection) for selection in likely_next(
+        year_list, continent_list, selected_year, selected_continent, selected_country)])
+
+
+def render():
+    # The workbook is parsed once into an Arrow sidecar and memoized per
+    # process, so reruns reuse the same frames and growth table.
+    # Sidebar
+    with st.sidebar:
+        st.title('World Population Analysis')
+
+        # The annual series is interpolated once at load time, so every
+        # year is as cheap to select as a workbook year
+        annual = st.toggle('Every year (interpolated)', key='annual_years')
+        df_reshaped = load_annual_df() if annual else load_reshaped_df()
+        growth_table = load_growth_table(annual=annual)
+        year_list = growth_table.years[::-1]
+
+        selected_year = st.selectbox('Select a year', year_list)
+        
+        valid_continents = ['Africa', 'Asia', 'Europe', 'North America', 'South America']
+
+        # Filter continents excluding Oceania
+        filtered_continents = list(set(df_reshaped.continent.cat.categories) & set(valid_continents))
+
+        continent_list = ['All'] + sorted(filtered_continents)
+        selected_continent = st.selectbox('Select a continent', continent_list)
+
+        
+        if selected_continent == 'All':
+            df_selected_continent = df_reshaped
+            country_list = ['All'] + used_categories(df_reshaped.country)
+        else:
+            df_selected_continent = select_rows(df_reshaped, continent=selected_continent)
+            country_list = ['All'] + used_categories(df_selected_continent.country)
+        
+        selected_country = st.selectbox('Select a country', country_list)
+
+# Header design
+    colored_header(
+            label="📊 Dashboard",
+            description="You can manipulate the dashboard by adjust the sidebar data 👈",
+            color_name="orange-70",)
+    col = st.columns((1.3, 4.7, 2), gap='medium')    
+
+    # Only the map and comparison panels hold widgets, so only they are
+    # fragments: changing the color theme reruns just the map.  On full
+    # reruns every panel is served from its cache when its own inputs did
+    # not change.
+    with col[0]:
+        metrics_panel(growth_table, selected_year, selected_continent, selected_country,
+                      selected_year in growth_table.interpolated_years)
+
+    with col[1]:
+        map_panel(df_reshaped, selected_year, selected_continent, selected_country, annual)
+
+    with col[2]:
+        ranking_panel(df_reshaped, selected_year, selected_continent, selected_country, annual)
+
+    with st.expander("Fastest growing / fastest shrinking countries", expanded=False):
+        movers_panel(growth_table, selected_year, selected_continent)
+
+    with st.expander("Compare countries across years", expanded=False):
+        comparison_panel(df_reshaped, year_list, country_list, selected_country, annual)
+
+    prefetch_neighbors(df_reshaped, growth_table, year_list, continent_list, selected_year, selected_continent,
+                       selected_country, st.session_state.get('color_theme', COLOR_THEMES[0]), annual)
@@ -0,0 +1,112 @@
+"""Dataset page: the raw and reshaped tables with variable descriptions."""
+import streamlit as st
+from streamlit_extras.colored_header import colored_header
+
+from world_population.browser import PAGE_SIZES, query_page
+from world_population.geo import load_iso3_index
+from world_population.data import (WORKBOOK_PATH, WORLDPOP_PATH, file_signature, load_merged_df,
+                                   load_reshaped_df, load_worldpop_df, reshaped_memory_usage)
+
+
+def dataset_browser(name, df, dataset_key):
+    # Filtering, sorting and paging run on the server; only the visible page
+    # of the projected columns is sent to the browser
+    all_columns = list(df.columns)
+    with st.expander("Columns, filter and sort"):
+        columns = st.multiselect('Columns', all_columns, default=all_columns, key=f'{name}_columns')
+        filter_column = st.selectbox('Filter column', [None] + all_columns, key=f'{name}_filter_column')
+        filter_text = st.text_input('Filter value', key=f'{name}_filter_text',
+                                    disabled=filter_column is None)
+        sort_by = st.selectbox('Sort by', [None] + all_columns, key=f'{name}_sort_by')
+        ascending = st.toggle('Ascending', value=True, key=f'{name}_ascending')
+        page_size = st.selectbox('Rows per page', PAGE_SIZES, index=1, key=f'{name}_page_size')
+
+    page_key = f'{name}_page'
+    page_df, total_rows, page_count = query_page(
+        df, dataset_key, columns, filter_column, filter_text, sort_by, ascending,
+        st.session_state.get(page_key, 1), page_size)
+    # Keep the page selector in range when a filter shrinks the result
+    page = min(st.session_state.get(page_key, 1), page_count)
+    st.session_state[page_key] = page
+
+    st.dataframe(page_df, hide_index=True)
+    st.number_input(f'Page (of {page_count})', min_value=1, max_value=page_count, key=page_key)
+    first_row = (page - 1) * page_size + 1 if total_rows else 0
+    st.caption(f"Rows {first_row}-{first_row + len(page_df) - 1 if total_rows else 0} of {total_rows}")
+
+
+def render():
+    merged_df = load_merged_df()
+    df_reshaped = load_reshaped_df()
+    workbook_signature = file_signature(WORKBOOK_PATH)
+
+    colored_header(
+        label="World Population Dataset",
+        description="Select the boxes below to see our Dataset👇",
+        color_name="blue-green-70",)
+    # Display the DataFrame as a table in the app
+    choice = st.selectbox('Please select the datasets you want to learn about:',('Main dataset','Reshaped dataset - Dashboard Data','Additional dataset - Population Story Tellings Data'))
+    st.caption(f"You selected: {choice}")   
+    if choice == 'Main dataset':
+        dataset_browser('merged', merged_df, ('merged', workbook_signature))
+        st.markdown(
+    """
+**Explanation about the variables with in the data set**
+1. :orange[**country:**] The name of the country.
+2. :orange[**year:**] The year of the data point, ranging from 1970 to 2050. 
+3. :orange[**continent:**] The continent of the country.
+4. :orange[**population:**] The population of the country in the selected year.
+5. :orange[**growth rate:**] The annual population growth rate of the country. 
+6. :orange[**popl_rank:**] The global rank of the country based on its population. 
+7. :orange[**yr_change:**] The change in population from 2022 to 2023.
+8. :orange[**net_change:**] The net change in population from the previous year. 
+9. :orange[**dens:**] The population density (population per square kilometer). 
+10. :orange[**land_area:**] The total land area of the country in square kilometers. 
+11. :orange[**migr:**] The net migration (immigration minus emigration) in the given year. 
+12. :orange[**fert:**] The fertility rate of the country.
+13. :orange[**medage:**] The median age of the population.
+
+    **Note: The average age in a population is generally calculated as the median, which measures the age above which is found one-half the population and below which is the other half  (Volansky, 2010).**
+
+    """)
+    if choice == 'Reshaped dataset - Dashboard Data':
+        col = st.columns((1.3, 2.5), gap='medium')    
+
+    # World Map
+        with col[0]:
+
+            dataset_browser('reshaped', df_reshaped, ('reshaped', workbook_signature))
+            object_bytes, compact_bytes = reshaped_memory_usage()
+            st.caption(f"In memory: {compact_bytes / 1024:.0f} KB per loaded copy "
+                       f"({object_bytes / 1024:.0f} KB with object columns and string years)")
+
+        with col[1]:
+            st.write("*This is a dataset that has been customized and processed to function independently interactive dashboard. The original data of this dataframe is taken from merged_df and processed through long format data to obtain more detailed info for each country, thereby increasing customization and interaction.*")    
+
+            st.write("**VARIABLES:**")
+            st.markdown("1. :blue[**Country:**] Names of 215 countries in the world")
+            st.markdown("2. :blue[**Continent:**] Names of the continent that each country belongs to")
+            st.markdown("3. :blue[**Year:**] The year of the data point, ranging from 1970 to 2050")
+            st.markdown("4. :blue[**Population:**] The population of the country in the selected year and country")
+            st.markdown("5. :blue[**ISO3:**] The ISO 3166 alpha-3 code of the country, used to place it on the map")
+            country_index = load_iso3_index()
+            if country_index.unresolved:
+                st.caption(f"Not on the map (no ISO-3 code): {', '.join(country_index.unresolved)}")
+
+    if choice =='Additional dataset - Population Story Tellings Data':
+        col = st.columns((1.3, 2.5), gap='medium')    
+
+    # World Map
+        with col[0]:
+            worldpop = load_worldpop_df()
+            dataset_browser('worldpop', worldpop, ('worldpop', file_signature(WORLDPOP_PATH)))
+
+        with col[1]:
+            st.write("*This carefully selected dataset was included for two reasons relevant to our research project. First and foremost, it aims to provide keen readers with a detailed and nuanced summary of key data on the world's population. By consolidating statistical data on demographic trends, migration patterns, birth and death rates, this dataset contributes to a deeper understanding of the population environment complexities that humanity faces. Second, a more comprehensive set of global population statistics is needed to create the series of charts in Population Story Tellings section. This episode takes us on a fascinating journey through the complex story of global population dynamics, as we piece together the facts.*")    
+
+            st.write("**VARIABLES:**")
+            st.markdown("1. :blue[**Year:**] The year of the data point, ranging from 1950 to 2060.")
+            st.markdown("2. :blue[**Region:**] Names of the continents.")
+            st.markdown("3. :blue[**Period:**] The detail status of years which filters the Past (Confirmed Data) or Future (Conjectured Data).")
+            st.markdown("4. :blue[**Category:**] Includes population categories such as the number of births, deaths, immigration, emigration and total population over the years of each continent.")
+            st.markdown("5. :blue[**Low, Medium, High:**] Three levels of population conjecture in the above categories.")
@@ -0,0 +1,61 @@
+"""Home page."""
+import streamlit as st
+import streamlit_lottie  # noqa: F401 - registers st.lottie
+from annotated_text import annotated_text
+from streamlit_extras.colored_header import colored_header
+
+from world_population.assets import asset_path, load_lottie
+
+
+def show_lottie(name):
+    # Animations come from the local asset store; say which one is missing
+    # and how to vendor it rather than leaving an unexplained gap
+    animation = load_lottie(name)
+    if animation is None:
+        st.caption(f"Animation {name!r} is not installed ({asset_path(name).name} is missing "
+                   f"from assets/lottie/); run `python -m world_population.assets` to download it.")
+        return
+    st.lottie(animation)
+
+
+def render():
+    colored_header(
+        label="🗝️ Welcome to our  Web Application",
+        description="About this Web App",
+        color_name="blue-70",)
+    left_column, right_column = st.columns(2)
+    with left_column:
+        show_lottie("welcome")
+
+    with right_column:
+        annotated_text("Have you ever wondered how our planet's population is constantly shifting and evolving? This interactive web app takes you on a captivating journey to explore the fascinating world of demographics.")
+        annotated_text("Imagine a mesmerizing animated map pulsating with life, visualizing population growth and movement across continents. Or, dive into captivating, dynamic graphs that unveil hidden stories within the data. Our intuitive dashboard acts as your personal guide, offering clear explanations alongside these captivating visuals.")
+        annotated_text("With just a few clicks or swipes, you can delve deeper.  Analyze year-over-year population surges, witness geographical distribution shifts unfold in real-time animations, and uncover the fascinating stories these trends reveal.")
+        annotated_text("The power of knowledge is at your fingertips.  Make informed decisions based on these valuable insights and gain a deeper understanding of the ever-changing population landscape that shapes our world.")
+
+    colored_header(
+        label="🧭 Overview",
+        description="About World Population",
+        color_name="light-blue-70",)
+    left_column, right_column = st.columns(2)
+    with left_column:
+        annotated_text("The world population dataset is a treasure trove of information, offering a comprehensive picture of global demographics from 1970 to 2050. It dives deep into population counts, growth rates, fertility trends, and the rise of urbanization. This rich data allows us to analyze these trends not only on a global scale, but also for individual nations.")
+        annotated_text("By providing insights into population distribution and density, this dataset empowers policymakers to make informed decisions about resource allocation. This dataset's value extends far beyond raw statistics. It equips us to address critical global challenges and pave the way for a more prosperous future for all.")
+
+    with right_column:
+        show_lottie("overview")
+
+
+
+    st.sidebar.write("# Welcome to Our Python 2 Project 👋")
+    st.sidebar.write("""This project aims to create an interactive dashboard that visually presents and generates various analyses from our first Python module.""")
+
+    st.sidebar.write("# Our Previous Projects")
+
+    # Link 1: Rstudio Project
+    link1 = "Rstudio [Project](https://drive.google.com/drive/u/0/folders/1-qxb59BRJ1NNmQvJi99cgOFCYWeJzBkm?lfhs=2)"
+    st.sidebar.write(link1, unsafe_allow_html=True)
+
+    # Link 2: Python 1 Project
+    link2 = "Python 1 [Project](https://drive.google.com/drive/u/0/folders/1-qxb59BRJ1NNmQvJi99cgOFCYWeJzBkm?lfhs=2)"
+    st.sidebar.write(link2, unsafe_allow_html=True)
@@ -0,0 +1,82 @@
+"""Optional sidebar "Performance" panel listing this rerun's timing spans."""
+import functools
+
+import streamlit as st
+
+from world_population import perf
+from world_population.prefetch import prefetcher
+
+
+def _script_run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx()
+
+
+def start_run(fragment=None):
+    """Start a span collection for this script run, tagged with the session id."""
+    ctx = _script_run_ctx()
+    return perf.start_run(ctx.session_id if ctx else None, fragment)
+
+
+def fragment(fn):
+    """``st.fragment`` whose reruns of its own are timed as a run.
+
+    A fragment-only rerun skips the top of ``Python_2.py``, where the run is
+    started, and runs on a new thread, so the fragment starts one itself.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        ctx = _script_run_ctx()
+        if ctx is not None and ctx.fragment_ids_this_run:
+            start_run(fragment=fn.__name__)
+        return fn(*args, **kwargs)
+    return st.fragment(wrapper)
+
+
+def render_sidebar_panel():
+    if not st.sidebar.toggle('Performance', key='show_performance'):
+        return
+    # Imported here: this module loads at startup, before any page, and the
+    # registry would pull pandas and pyarrow into every cold start
+    from world_population.data import datasets
+
+    run = perf.current_run()
+    # This rerun, preceded by the fragment reruns since the previous full one
+    runs = []
+    if run:
+        for recent in reversed([other for other in perf.recent_runs(run.session_id) if other is not run]):
+            if recent.fragment is None:
+                break
+            runs.insert(0, recent)
+        runs.append(run)
+    spans = [(recent.fragment or 'this rerun', span) for recent in runs for span in recent.spans]
+    with st.sidebar.expander('Performance', expanded=True):
+        if not spans:
+            st.caption('No instrumented stage ran in this rerun (results came from cache).')
+        else:
+            st.dataframe(
+                [{'run': label,
+                  'stage': span.name,
+                  'ms': round(span.duration_ms, 2),
+                  'KB': round(span.bytes / 1024, 1) if span.bytes is not None else None,
+                  'rows': span.rows}
+                 for label, span in spans],
+                hide_index=True)
+        if run:
+            st.caption(f'session {run.session_id[:8]} · run {run.run_id}')
+        # Shared datasets: loaded once per process, viewed by every session
+        st.dataframe(
+            [{'dataset': name, 'KB': round(stats['bytes'] / 1024, 1),
+              'loads': stats['loads'], 'live views': stats['live_views']}
+             for name, stats in datasets.stats().items()],
+            hide_index=True)
+        # Background prefetch of neighboring Dashboard selections
+        prefetch = prefetcher.stats()
+        st.caption(f"Prefetch: {prefetch['hits']} hits / {prefetch['hits'] + prefetch['misses']} selections "
+                   f"({prefetch['hit_rate']:.0%}), {prefetch['completed']} built, "
+                   f"{prefetch['cancelled'] + prefetch['stale']} cancelled, {prefetch['in_flight']} in flight")
+        log_path = perf.log_path()
+        st.caption(f'Log: {log_path}' if log_path else 'JSONL log off (set WORLDPOP_PERF_LOG=on to record spans)')
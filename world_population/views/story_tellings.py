@@ -0,0 +1,68 @@
+"""Story Tellings page: the animated ipyvizzu story and scenario projection for a region."""
+import plotly.express as px
+import streamlit as st
+from streamlit.components.v1 import html
+from streamlit_extras.colored_header import colored_header
+
+from world_population import perf
+from world_population.data import load_worldpop_df
+from world_population.projection import COMPONENTS, SCENARIOS, load_projection_engine
+from world_population.story import STORY_HEIGHT, STORY_WIDTH, story_html
+from world_population.views import performance
+
+
+def render():
+    colored_header(
+            label="📜Population Story Tellings",
+            description="This is comprehensive information of the world population - Press the next button to see the animation",
+            color_name="yellow-70",)
+
+    width=STORY_WIDTH
+    height=STORY_HEIGHT
+
+    df = load_worldpop_df()
+    regions = df['Region'].unique()
+
+    sel_region = st.selectbox(
+        'Select region',
+        list(regions))
+
+    # The story for each region is built once and served from the
+    # in-memory / on-disk story cache afterwards
+    html(story_html(sel_region, width, height), width=width, height=height)
+
+    st.subheader(f"Scenario projection for {sel_region}")
+    projection_panel(sel_region)
+
+
+@performance.fragment
+def projection_panel(sel_region):
+    # Scale the birth, death and migration flows of the Low / Medium / High
+    # variants and replay them from the last observed year
+    engine = load_projection_engine()
+    cols = st.columns(len(COMPONENTS))
+    multipliers = {}
+    for col, component in zip(cols, COMPONENTS):
+        with col:
+            percent = st.slider(f'{component} (%)', -50, 50, 0, step=5, key=f'projection_{component}')
+        multipliers[component] = 1 + percent / 100
+
+    with perf.span('projection'):
+        projected = engine.project_frame(multipliers, sel_region)
+        baseline = engine.project_frame(None, sel_region)
+
+    fig = px.line(projected, x='Year', y='Population', color='Scenario',
+                  category_orders={'Scenario': SCENARIOS})
+    for trace in px.line(baseline, x='Year', y='Population', color='Scenario',
+                         category_orders={'Scenario': SCENARIOS}).data:
+        trace.update(line_dash='dot', opacity=0.5, showlegend=False, hoverinfo='skip')
+        fig.add_trace(trace)
+    fig.update_layout(template='plotly_dark', plot_bgcolor='rgba(0, 0, 0, 0)',
+                      paper_bgcolor='rgba(0, 0, 0, 0)', height=360)
+    st.plotly_chart(fig)
+
+    last = projected[projected['Year'] == engine.years[-1]].set_index('Scenario')['Population']
+    last_baseline = baseline[baseline['Year'] == engine.years[-1]].set_index('Scenario')['Population']
+    st.caption(f"{engine.years[-1]}, Medium: {last['Medium'] / 1e6:,.1f}M "
+               f"({(last['Medium'] - last_baseline['Medium']) / 1e6:+,.1f}M against the CSV). "
+               "Dotted lines are the unadjusted variants.")
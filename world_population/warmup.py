@@ -0,0 +1,131 @@
+"""Opt-in warm-up of the shared figure and story caches.
+
+After a deploy the first visitors would otherwise pay for every cold
+choropleth and story build.  Run this before starting the server::
+
+    export WORLDPOP_CACHE_BACKEND=disk   # or redis://...
+    python -m world_population.warmup --budget 120 && streamlit run Python_2.py
+
+It precomputes, on a process pool, the choropleth of every year at the
+'All' and per-continent levels (default color theme, country 'All') and
+the Story Tellings HTML of every ``Region`` in ``worldpop.csv``, writing
+them to the shared cache backend (``.cache/shared/`` or Redis: see
+:mod:`world_population.shared_cache`), which must therefore be configured:
+the default in-process backend would be gone when the command exits.
+Progress is printed as tasks finish; tasks not started when the time budget
+runs out are cancelled and built on demand as usual.
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+
+from world_population.data import WORKBOOK_PATH, WORLDPOP_PATH, load_reshaped_df, load_worldpop_df
+
+ALL = 'All'
+
+
+def warmup_tasks(workbook_path=WORKBOOK_PATH, worldpop_path=WORLDPOP_PATH):
+    """Return the warm-up tasks, slowest (stories) first."""
+    from world_population.figures import COLOR_THEMES
+    from world_population.story import STORY_HEIGHT, STORY_WIDTH
+
+    df_reshaped = load_reshaped_df(workbook_path)
+    years = sorted({int(year) for year in df_reshaped['year'].unique()}, reverse=True)
+    continents = [ALL] + sorted(str(continent) for continent in df_reshaped['continent'].unique())
+    regions = list(load_worldpop_df(worldpop_path)['Region'].unique())
+
+    tasks = [('story', region, STORY_WIDTH, STORY_HEIGHT) for region in regions]
+    tasks += [('choropleth', year, continent, ALL, COLOR_THEMES[0])
+              for continent in continents for year in years]
+    return tasks
+
+
+def run_task(task):
+    """Build one task into the shared cache; return its wall time in seconds."""
+    start = time.perf_counter()
+    kind, *args = task
+    if kind == 'story':
+        from world_population.story import story_html
+        story_html(*args)
+    elif kind == 'choropleth':
+        from world_population.figures import cached_choropleth
+        cached_choropleth(load_reshaped_df(), *args)
+    else:
+        raise ValueError(f'unknown warm-up task {kind!r}')
+    return time.perf_counter() - start
+
+
+def warm_up(tasks=None, workers=None, budget=None, progress=None):
+    """Run ``tasks`` on a process pool; return a summary dict.
+
+    ``progress(done, total, task, seconds)`` is called as each task
+    finishes.  When ``budget`` seconds have passed, the remaining tasks are
+    cancelled and reported under ``'cancelled'``.
+    """
+    from world_population.shared_cache import default_backend
+
+    start = time.perf_counter()
+    # Load (and write the Arrow sidecars of) the datasets once here, so the
+    # workers map the sidecars instead of each parsing the workbook
+    tasks = list(tasks if tasks is not None else warmup_tasks())
+    pruned = default_backend().prune()
+    summary = {'total': len(tasks), 'done': 0, 'failed': [], 'cancelled': 0, 'pruned': pruned}
+    if not tasks:
+        summary['seconds'] = time.perf_counter() - start
+        return summary
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    futures = {executor.submit(run_task, task): task for task in tasks}
+    timeout = None if budget is None else max(0.0, budget - (time.perf_counter() - start))
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=timeout):
+            task = futures[future]
+            try:
+                seconds = future.result()
+            except Exception as exc:
+                summary['failed'].append((task, repr(exc)))
+                continue
+            summary['done'] += 1
+            if progress is not None:
+                progress(summary['done'], len(tasks), task, seconds)
+    except concurrent.futures.TimeoutError:
+        summary['cancelled'] = sum(future.cancel() for future in futures)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def _print_progress(done, total, task, seconds):
+    print(f'[{done}/{total}] {" ".join(str(part) for part in task)} ({seconds:.2f}s)', flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute the shared figure and story caches')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--budget', type=float, default=None,
+                        help='stop scheduling work after this many seconds')
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    args = parser.parse_args(argv)
+
+    from world_population.shared_cache import BACKEND_ENV, MemoryBackend, default_backend
+    if isinstance(default_backend(), MemoryBackend):
+        print(f'{BACKEND_ENV} is not set to a shared backend (disk, disk:/path or redis://...); '
+              'nothing to warm up', file=sys.stderr)
+        return 2
+
+    summary = warm_up(workers=args.workers, budget=args.budget,
+                      progress=None if args.quiet else _print_progress)
+    print(f"warmed {summary['done']}/{summary['total']} in {summary['seconds']:.1f}s"
+          f" ({summary['cancelled']} cancelled, {len(summary['failed'])} failed,"
+          f" {summary['pruned']} expired entries removed)")
+    for task, error in summary['failed']:
+        print(f'  failed: {task}: {error}', file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())